@@ -0,0 +1,43 @@
+"""
+Backfill fact embeddings where pgvector is installed.
+
+    python -m app.backfill
+"""
+import asyncio
+import logging
+import sys
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.db import engine
+from app.services import extraction
+
+logger = logging.getLogger("novel_engine.backfill")
+
+
+async def backfill_embeddings() -> int:
+    """Embed every fact still missing one; returns the number of facts embedded."""
+    try:
+        # One connection for the whole run, so the vector codec is
+        # registered once and every batch commits on it
+        async with engine.connect() as conn:
+            async with AsyncSession(bind=conn, expire_on_commit=False) as db:
+                return await crud.backfill_fact_embeddings(db, extraction.embed_facts)
+    finally:
+        await engine.dispose()
+
+
+def main():
+    """Backfill entry point."""
+    logging.basicConfig(
+        level=logging.INFO,
+        stream=sys.stdout,
+        format="%(asctime)s %(name)s %(levelname)s %(message)s"
+    )
+    logger.info("Backfilling fact embeddings...")
+    updated = asyncio.run(backfill_embeddings())
+    logger.info("Embedded %d fact(s)", updated)
+
+
+if __name__ == "__main__":
+    main()
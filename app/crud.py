@@ -1,422 +1,1061 @@
 """
 CRUD operations for the System-2 Novel Engine.
 """
-from typing import Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from typing import Callable, Optional
+import orjson
+from pgvector.asyncpg import register_vector
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, aggregate_order_by
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.ext.asyncio import AsyncMappingResult, AsyncSession
+from sqlalchemy.orm import aliased, raiseload, selectinload
+from sqlalchemy import (
+    Integer, Select, and_, bindparam, delete, exists, func, insert, literal, literal_column,
+    select, text, tuple_, update
+)
 
 from app import models, schemas
 
+# Rows fetched per round trip when a list endpoint streams its results.
+# List helpers select table columns rather than entities, so rows stream
+# back as plain mappings without ORM instance construction.
+STREAM_BATCH_SIZE = 100
+
+# Attempts for a "next number" insert that loses a race to a concurrent writer
+NEXT_NUMBER_ATTEMPTS = 3
+
+# Fact batches below this size go out as one multi-row INSERT ... RETURNING
+# (a single page of insertmanyvalues, see app.db); batches of at least this
+# many rows are written with COPY.
+FACT_COPY_THRESHOLD = 100
+
+# Facts embedded and written per transaction by backfill_fact_embeddings
+FACT_EMBEDDING_BATCH_SIZE = 200
+
+
+async def _insert_next_number(
+    db: AsyncSession, stmt, constraint_name: str, commit: bool = True
+):
+    """
+    Execute an INSERT ... SELECT COALESCE(MAX(n), 0) + 1 ... RETURNING statement
+    and return the inserted rows.
+
+    Two concurrent writers can compute the same number; the loser trips the
+    unique constraint and is retried against the new maximum. With
+    commit=False each attempt runs in a savepoint, so a lost race rolls back
+    only the insert and not the caller's open transaction.
+    """
+    for attempt in range(1, NEXT_NUMBER_ATTEMPTS + 1):
+        try:
+            if not commit:
+                async with db.begin_nested():
+                    return (await db.scalars(stmt)).all()
+            objs = (await db.scalars(stmt)).all()
+            await db.commit()
+            return objs
+        except IntegrityError as e:
+            if commit:
+                await db.rollback()
+            # asyncpg chains its own exception, which carries the constraint name
+            violated = getattr(e.orig.__cause__, "constraint_name", None)
+            if violated != constraint_name or attempt == NEXT_NUMBER_ATTEMPTS:
+                raise
+
+
+async def _update_by_id(db: AsyncSession, model, row_id: int, values: dict, commit: bool = True):
+    """
+    UPDATE ... RETURNING one row by primary key; a no-op patch just reads it.
+
+    Relationships are left unloaded, including lazy="selectin" ones. With
+    commit=False the change is left in the caller's open transaction.
+    """
+    if not values:
+        return await db.get(model, row_id, options=[raiseload("*")])
+    db_obj = await db.scalar(
+        update(model)
+        .where(model.id == row_id)
+        .values(**values)
+        .returning(model)
+        .options(raiseload("*"))
+    )
+    if commit:
+        await db.commit()
+    return db_obj
+
 
 # ============================================================================
 # Project CRUD
 # ============================================================================
 
-def create_project(db: Session, project: schemas.ProjectCreate) -> models.Project:
-    db_project = models.Project(**project.model_dump())
-    db.add(db_project)
-    db.commit()
-    db.refresh(db_project)
+async def create_project(db: AsyncSession, project: schemas.ProjectCreate) -> models.Project:
+    db_project = await db.scalar(
+        insert(models.Project)
+        .values(**project.model_dump())
+        .returning(models.Project)
+    )
+    await db.commit()
     return db_project
 
 
-def get_project(db: Session, project_id: int) -> Optional[models.Project]:
-    return db.query(models.Project).filter(models.Project.id == project_id).first()
+# Point lookups by primary key are built once at import with an "id" bind
+# parameter, so each call skips statement construction and goes straight to
+# SQLAlchemy's compiled-SQL cache. raiseload("*") turns any relationship
+# access the caller did not load explicitly into an error instead of an
+# implicit per-row query.
+_GET_PROJECT = (
+    select(models.Project)
+    .options(raiseload("*"))
+    .where(models.Project.id == bindparam("id"))
+)
+
+
+async def get_project(db: AsyncSession, project_id: int) -> Optional[models.Project]:
+    return await db.scalar(_GET_PROJECT, {"id": project_id})
+
+
+_GET_LATEST_STYLE_BIBLE = (
+    select(models.StyleBible)
+    .where(models.StyleBible.project_id == bindparam("project_id"))
+    .order_by(models.StyleBible.version.desc())
+    .limit(1)
+)
+
 
+async def get_latest_style_bible(
+    db: AsyncSession, project_id: int
+) -> Optional[models.StyleBible]:
+    """Highest version of the project's style bible, via uq_style_bible_project_version."""
+    return await db.scalar(_GET_LATEST_STYLE_BIBLE, {"project_id": project_id})
 
-def get_projects(db: Session, skip: int = 0, limit: int = 100) -> list[models.Project]:
-    return db.query(models.Project).offset(skip).limit(limit).all()
 
+async def project_exists(db: AsyncSession, project_id: int) -> bool:
+    return await db.scalar(select(exists().where(models.Project.id == project_id)))
 
-def delete_project(db: Session, project_id: int) -> bool:
-    db_project = get_project(db, project_id)
-    if db_project:
-        db.delete(db_project)
-        db.commit()
-        return True
-    return False
+
+async def get_projects(
+    db: AsyncSession, after_id: Optional[int] = None, limit: int = 100
+) -> AsyncMappingResult:
+    stmt = select(models.Project.__table__).order_by(models.Project.id)
+    if after_id is not None:
+        stmt = stmt.where(models.Project.id > after_id)
+    result = await db.stream(
+        stmt.limit(limit).execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    return result.mappings()
+
+
+async def delete_project(db: AsyncSession, project_id: int) -> bool:
+    result = await db.execute(delete(models.Project).where(models.Project.id == project_id))
+    await db.commit()
+    return result.rowcount > 0
 
 
 # ============================================================================
 # Character CRUD
 # ============================================================================
 
-def create_character(
-    db: Session, project_id: int, character: schemas.CharacterCreate
+async def create_character(
+    db: AsyncSession, project_id: int, character: schemas.CharacterCreate
 ) -> models.Character:
-    db_character = models.Character(project_id=project_id, **character.model_dump())
-    db.add(db_character)
-    db.commit()
-    db.refresh(db_character)
+    db_character = await db.scalar(
+        insert(models.Character)
+        .values(project_id=project_id, **character.model_dump())
+        .returning(models.Character)
+    )
+    await db.commit()
     return db_character
 
 
-def get_character(db: Session, character_id: int) -> Optional[models.Character]:
-    return db.query(models.Character).filter(models.Character.id == character_id).first()
+_GET_CHARACTER = select(models.Character).where(models.Character.id == bindparam("id"))
 
 
-def get_characters(
-    db: Session, project_id: int, skip: int = 0, limit: int = 100
-) -> list[models.Character]:
-    return (
-        db.query(models.Character)
-        .filter(models.Character.project_id == project_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+async def get_character(db: AsyncSession, character_id: int) -> Optional[models.Character]:
+    return await db.scalar(_GET_CHARACTER, {"id": character_id})
+
+
+async def get_characters(
+    db: AsyncSession, project_id: int, after_id: Optional[int] = None, limit: int = 100
+) -> AsyncMappingResult:
+    stmt = (
+        select(models.Character.__table__)
+        .where(models.Character.project_id == project_id)
+        .order_by(models.Character.id)
     )
+    if after_id is not None:
+        stmt = stmt.where(models.Character.id > after_id)
+    result = await db.stream(
+        stmt.limit(limit).execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    return result.mappings()
 
 
-def update_character(
-    db: Session, character_id: int, character: schemas.CharacterUpdate
+async def update_character(
+    db: AsyncSession, character_id: int, character: schemas.CharacterUpdate
 ) -> Optional[models.Character]:
-    db_character = get_character(db, character_id)
-    if db_character:
-        update_data = character.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_character, field, value)
-        db.commit()
-        db.refresh(db_character)
-    return db_character
+    return await _update_by_id(
+        db, models.Character, character_id, character.model_dump(exclude_unset=True)
+    )
 
 
-def delete_character(db: Session, character_id: int) -> bool:
-    db_character = get_character(db, character_id)
-    if db_character:
-        db.delete(db_character)
-        db.commit()
-        return True
-    return False
+async def delete_character(db: AsyncSession, character_id: int) -> bool:
+    result = await db.execute(delete(models.Character).where(models.Character.id == character_id))
+    await db.commit()
+    return result.rowcount > 0
 
 
 # ============================================================================
 # Location CRUD
 # ============================================================================
 
-def create_location(
-    db: Session, project_id: int, location: schemas.LocationCreate
+async def create_location(
+    db: AsyncSession, project_id: int, location: schemas.LocationCreate
 ) -> models.Location:
-    db_location = models.Location(project_id=project_id, **location.model_dump())
-    db.add(db_location)
-    db.commit()
-    db.refresh(db_location)
+    db_location = await db.scalar(
+        insert(models.Location)
+        .values(project_id=project_id, **location.model_dump())
+        .returning(models.Location)
+    )
+    await db.commit()
     return db_location
 
 
-def get_location(db: Session, location_id: int) -> Optional[models.Location]:
-    return db.query(models.Location).filter(models.Location.id == location_id).first()
+_GET_LOCATION = select(models.Location).where(models.Location.id == bindparam("id"))
 
 
-def get_locations(
-    db: Session, project_id: int, skip: int = 0, limit: int = 100
-) -> list[models.Location]:
-    return (
-        db.query(models.Location)
-        .filter(models.Location.project_id == project_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+async def get_location(db: AsyncSession, location_id: int) -> Optional[models.Location]:
+    return await db.scalar(_GET_LOCATION, {"id": location_id})
+
+
+async def get_locations(
+    db: AsyncSession, project_id: int, after_id: Optional[int] = None, limit: int = 100
+) -> AsyncMappingResult:
+    stmt = (
+        select(models.Location.__table__)
+        .where(models.Location.project_id == project_id)
+        .order_by(models.Location.id)
+    )
+    if after_id is not None:
+        stmt = stmt.where(models.Location.id > after_id)
+    result = await db.stream(
+        stmt.limit(limit).execution_options(yield_per=STREAM_BATCH_SIZE)
     )
+    return result.mappings()
 
 
-def update_location(
-    db: Session, location_id: int, location: schemas.LocationUpdate
+async def update_location(
+    db: AsyncSession, location_id: int, location: schemas.LocationUpdate
 ) -> Optional[models.Location]:
-    db_location = get_location(db, location_id)
-    if db_location:
-        update_data = location.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_location, field, value)
-        db.commit()
-        db.refresh(db_location)
-    return db_location
+    return await _update_by_id(
+        db, models.Location, location_id, location.model_dump(exclude_unset=True)
+    )
 
 
-def delete_location(db: Session, location_id: int) -> bool:
-    db_location = get_location(db, location_id)
-    if db_location:
-        db.delete(db_location)
-        db.commit()
-        return True
-    return False
+async def delete_location(db: AsyncSession, location_id: int) -> bool:
+    result = await db.execute(delete(models.Location).where(models.Location.id == location_id))
+    await db.commit()
+    return result.rowcount > 0
 
 
 # ============================================================================
 # Scene CRUD
 # ============================================================================
 
-def create_scene(
-    db: Session, project_id: int, scene: schemas.SceneCreate
+async def create_scene(
+    db: AsyncSession, project_id: int, scene: schemas.SceneCreate
 ) -> models.Scene:
-    db_scene = models.Scene(project_id=project_id, **scene.model_dump())
-    db.add(db_scene)
-    db.commit()
-    db.refresh(db_scene)
+    db_scene = await db.scalar(
+        insert(models.Scene)
+        .values(project_id=project_id, **scene.model_dump())
+        .returning(models.Scene)
+    )
+    await db.commit()
     return db_scene
 
 
-def get_scene(db: Session, scene_id: int) -> Optional[models.Scene]:
-    return db.query(models.Scene).filter(models.Scene.id == scene_id).first()
+_GET_SCENE = (
+    select(models.Scene)
+    .options(raiseload("*"))
+    .where(models.Scene.id == bindparam("id"))
+)
 
 
-def get_scenes(
-    db: Session, project_id: int, skip: int = 0, limit: int = 100
-) -> list[models.Scene]:
-    return (
-        db.query(models.Scene)
-        .filter(models.Scene.project_id == project_id)
-        .order_by(models.Scene.chapter_no, models.Scene.scene_no)
-        .offset(skip)
-        .limit(limit)
-        .all()
+async def get_scene(db: AsyncSession, scene_id: int) -> Optional[models.Scene]:
+    return await db.scalar(_GET_SCENE, {"id": scene_id})
+
+
+async def scene_exists(db: AsyncSession, scene_id: int) -> bool:
+    return await db.scalar(select(exists().where(models.Scene.id == scene_id)))
+
+
+async def get_existing_scene_ids(db: AsyncSession, scene_ids: list[int]) -> set[int]:
+    """Which of the given scene IDs exist, in one primary-key lookup."""
+    if not scene_ids:
+        return set()
+    return set(
+        (await db.scalars(select(models.Scene.id).where(models.Scene.id.in_(scene_ids)))).all()
+    )
+
+
+async def get_scenes(
+    db: AsyncSession, project_id: int, after_id: Optional[int] = None, limit: int = 100
+) -> AsyncMappingResult:
+    sort_key = tuple_(models.Scene.chapter_no, models.Scene.scene_no, models.Scene.id)
+    stmt = (
+        select(models.Scene.__table__)
+        .where(models.Scene.project_id == project_id)
+        .order_by(models.Scene.chapter_no, models.Scene.scene_no, models.Scene.id)
     )
+    if after_id is not None:
+        # Keyset on (chapter_no, scene_no, id), resolved from the cursor row
+        cursor = (
+            select(models.Scene.chapter_no, models.Scene.scene_no, models.Scene.id)
+            .where(models.Scene.id == after_id)
+            .subquery()
+        )
+        stmt = stmt.join(
+            cursor,
+            sort_key > tuple_(cursor.c.chapter_no, cursor.c.scene_no, cursor.c.id)
+        )
+    result = await db.stream(
+        stmt.limit(limit).execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    return result.mappings()
 
 
-def update_scene(
-    db: Session, scene_id: int, scene: schemas.SceneUpdate
+async def update_scene(
+    db: AsyncSession, scene_id: int, scene: schemas.SceneUpdate
 ) -> Optional[models.Scene]:
-    db_scene = get_scene(db, scene_id)
-    if db_scene:
-        update_data = scene.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_scene, field, value)
-        db.commit()
-        db.refresh(db_scene)
-    return db_scene
+    return await _update_by_id(
+        db, models.Scene, scene_id, scene.model_dump(exclude_unset=True)
+    )
 
 
-def delete_scene(db: Session, scene_id: int) -> bool:
-    db_scene = get_scene(db, scene_id)
-    if db_scene:
-        db.delete(db_scene)
-        db.commit()
-        return True
-    return False
+async def delete_scene(db: AsyncSession, scene_id: int) -> bool:
+    result = await db.execute(delete(models.Scene).where(models.Scene.id == scene_id))
+    await db.commit()
+    return result.rowcount > 0
 
 
 # ============================================================================
 # Draft CRUD (append-only - no update/delete)
 # ============================================================================
 
-def create_draft(
-    db: Session, scene_id: int, draft: schemas.DraftCreate
+async def create_draft(
+    db: AsyncSession, scene_id: int, draft: schemas.DraftCreate, commit: bool = True
 ) -> models.Draft:
-    # Get next version number
-    max_version = (
-        db.query(func.max(models.Draft.version))
-        .filter(models.Draft.scene_id == scene_id)
-        .scalar()
-    )
-    next_version = (max_version or 0) + 1
-    
-    db_draft = models.Draft(
-        scene_id=scene_id,
-        version=next_version,
-        text=draft.text
-    )
-    db.add(db_draft)
-    db.commit()
-    db.refresh(db_draft)
+    # Next version number is computed in the same statement as the insert
+    stmt = (
+        insert(models.Draft)
+        .from_select(
+            ["scene_id", "version", "text"],
+            select(
+                literal(scene_id),
+                func.coalesce(func.max(models.Draft.version), 0) + 1,
+                literal(draft.text)
+            ).where(models.Draft.scene_id == scene_id)
+        )
+        .returning(models.Draft)
+    )
+    (db_draft,) = await _insert_next_number(db, stmt, "uq_draft_scene_version", commit=commit)
     return db_draft
 
 
-def get_draft(db: Session, draft_id: int) -> Optional[models.Draft]:
-    return db.query(models.Draft).filter(models.Draft.id == draft_id).first()
+_GET_DRAFT = select(models.Draft).where(models.Draft.id == bindparam("id"))
 
 
-def get_drafts(
-    db: Session, scene_id: int, skip: int = 0, limit: int = 100
-) -> list[models.Draft]:
-    return (
-        db.query(models.Draft)
-        .filter(models.Draft.scene_id == scene_id)
+async def get_draft(db: AsyncSession, draft_id: int) -> Optional[models.Draft]:
+    return await db.scalar(_GET_DRAFT, {"id": draft_id})
+
+
+async def get_drafts(
+    db: AsyncSession, scene_id: int, after_id: Optional[int] = None, limit: int = 100
+) -> AsyncMappingResult:
+    stmt = (
+        select(models.Draft.__table__)
+        .where(models.Draft.scene_id == scene_id)
         .order_by(models.Draft.version.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
     )
+    if after_id is not None:
+        # Versions are unique per scene, so the cursor draft's version is the keyset
+        cursor = aliased(models.Draft)
+        stmt = stmt.where(
+            models.Draft.version
+            < select(cursor.version).where(cursor.id == after_id).scalar_subquery()
+        )
+    result = await db.stream(
+        stmt.limit(limit).execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    return result.mappings()
 
 
-def get_latest_draft(db: Session, scene_id: int) -> Optional[models.Draft]:
-    return (
-        db.query(models.Draft)
-        .filter(models.Draft.scene_id == scene_id)
+async def get_latest_draft(db: AsyncSession, scene_id: int) -> Optional[models.Draft]:
+    return await db.scalar(
+        select(models.Draft)
+        .where(models.Draft.scene_id == scene_id)
         .order_by(models.Draft.version.desc())
-        .first()
+        .limit(1)
     )
 
 
+async def get_latest_drafts(db: AsyncSession, scene_ids: list[int]) -> list[models.Draft]:
+    """Latest draft of each given scene in one DISTINCT ON query, ordered by scene ID."""
+    if not scene_ids:
+        return []
+    return (
+        await db.scalars(
+            select(models.Draft)
+            .where(models.Draft.scene_id.in_(scene_ids))
+            .distinct(models.Draft.scene_id)
+            .order_by(models.Draft.scene_id, models.Draft.version.desc())
+        )
+    ).all()
+
+
 # ============================================================================
 # Iteration CRUD
 # ============================================================================
 
-def create_iteration(db: Session, scene_id: int) -> models.Iteration:
-    # Get next iteration number
-    max_iteration = (
-        db.query(func.max(models.Iteration.iteration_no))
-        .filter(models.Iteration.scene_id == scene_id)
-        .scalar()
+async def create_iteration(db: AsyncSession, scene_id: int) -> models.Iteration:
+    # Next iteration number is computed in the same statement as the insert
+    stmt = (
+        insert(models.Iteration)
+        .from_select(
+            ["scene_id", "iteration_no", "status"],
+            select(
+                literal(scene_id),
+                func.coalesce(func.max(models.Iteration.iteration_no), 0) + 1,
+                literal("pending", models.Iteration.status.type)
+            ).where(models.Iteration.scene_id == scene_id)
+        )
+        .returning(models.Iteration)
+        # A new iteration has no check runs or tasks to load
+        .options(raiseload("*"))
     )
-    next_iteration = (max_iteration or 0) + 1
-    
-    db_iteration = models.Iteration(
-        scene_id=scene_id,
-        iteration_no=next_iteration,
-        status="pending"
+    (iteration,) = await _insert_next_number(db, stmt, "uq_iteration_scene_no")
+    return iteration
+
+
+async def create_iterations(
+    db: AsyncSession, scene_ids: list[int], commit: bool = True
+) -> list[models.Iteration]:
+    """
+    Create one pending iteration per entry of scene_ids in a single
+    INSERT ... SELECT, returned in scene_ids order.
+
+    Each is numbered after its scene's latest iteration, as in
+    create_iteration; a scene listed twice gets two consecutive numbers.
+    """
+    requested = (
+        func.unnest(literal(scene_ids, ARRAY(Integer)))
+        .table_valued("scene_id", with_ordinality="ord")
+        .render_derived()
     )
-    db.add(db_iteration)
-    db.commit()
-    db.refresh(db_iteration)
-    return db_iteration
+    latest_no = (
+        select(func.coalesce(func.max(models.Iteration.iteration_no), 0))
+        .where(models.Iteration.scene_id == requested.c.scene_id)
+        .scalar_subquery()
+    )
+    stmt = (
+        insert(models.Iteration)
+        .from_select(
+            ["scene_id", "iteration_no", "status"],
+            select(
+                requested.c.scene_id,
+                latest_no + func.row_number().over(
+                    partition_by=requested.c.scene_id, order_by=requested.c.ord
+                ),
+                literal("pending", models.Iteration.status.type)
+            )
+        )
+        .returning(models.Iteration)
+        .options(raiseload("*"))
+    )
+    iterations = await _insert_next_number(db, stmt, "uq_iteration_scene_no", commit=commit)
+    # RETURNING order is unspecified; hand each scene its iterations by number
+    by_scene: dict[int, list[models.Iteration]] = {}
+    for iteration in sorted(iterations, key=lambda i: i.iteration_no, reverse=True):
+        by_scene.setdefault(iteration.scene_id, []).append(iteration)
+    return [by_scene[scene_id].pop() for scene_id in scene_ids]
+
+
+# IterationRead embeds both collections; load each in one batched SELECT
+# (spelled out although the relationships default to lazy="selectin")
+_GET_ITERATION = (
+    select(models.Iteration)
+    .options(
+        selectinload(models.Iteration.check_runs),
+        selectinload(models.Iteration.tasks),
+        raiseload("*")
+    )
+    .where(models.Iteration.id == bindparam("id"))
+)
 
 
-def get_iteration(db: Session, iteration_id: int) -> Optional[models.Iteration]:
-    return db.query(models.Iteration).filter(models.Iteration.id == iteration_id).first()
+async def get_iteration(db: AsyncSession, iteration_id: int) -> Optional[models.Iteration]:
+    return await db.scalar(_GET_ITERATION, {"id": iteration_id})
 
 
-def update_iteration_status(
-    db: Session, iteration_id: int, status: str
+async def update_iteration_status(
+    db: AsyncSession, iteration_id: int, status: str, commit: bool = True
 ) -> Optional[models.Iteration]:
-    db_iteration = get_iteration(db, iteration_id)
-    if db_iteration:
-        db_iteration.status = status
-        db.commit()
-        db.refresh(db_iteration)
-    return db_iteration
+    return await _update_by_id(
+        db, models.Iteration, iteration_id, {"status": status}, commit=commit
+    )
+
+
+async def update_iterations_status(
+    db: AsyncSession, iteration_ids: list[int], status: str
+) -> None:
+    """Set the status of several iterations in one UPDATE."""
+    if not iteration_ids:
+        return
+    await db.execute(
+        update(models.Iteration)
+        .where(models.Iteration.id.in_(iteration_ids))
+        .values(status=status)
+    )
+    await db.commit()
 
 
 # ============================================================================
 # Task CRUD
 # ============================================================================
 
-def create_task(
-    db: Session,
+async def create_task(
+    db: AsyncSession,
     iteration_id: int,
     task_type: str,
-    input_jsonb: Optional[dict] = None
+    input_jsonb: Optional[dict] = None,
+    commit: bool = True
 ) -> models.Task:
-    db_task = models.Task(
-        iteration_id=iteration_id,
-        task_type=task_type,
-        status="pending",
-        input_jsonb=input_jsonb or {}
-    )
-    db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    values = {"iteration_id": iteration_id, "task_type": task_type, "status": "pending"}
+    if input_jsonb is not None:
+        values["input_jsonb"] = input_jsonb
+    db_task = await db.scalar(
+        insert(models.Task).values(**values).returning(models.Task)
+    )
+    if commit:
+        await db.commit()
     return db_task
 
 
-def get_task(db: Session, task_id: int) -> Optional[models.Task]:
-    return db.query(models.Task).filter(models.Task.id == task_id).first()
+async def create_tasks(
+    db: AsyncSession, tasks: list[dict], commit: bool = True
+) -> list[int]:
+    """
+    Insert several pending tasks in one executemany round trip and return
+    their IDs in order. Each dict carries iteration_id, task_type and
+    input_jsonb.
+    """
+    if not tasks:
+        return []
+    rows = [{**task, "status": "pending"} for task in tasks]
+    task_ids = (
+        await db.scalars(
+            insert(models.Task).returning(models.Task.id, sort_by_parameter_order=True),
+            rows
+        )
+    ).all()
+    if commit:
+        await db.commit()
+    return list(task_ids)
 
 
-def get_pending_task(db: Session, iteration_id: int) -> Optional[models.Task]:
-    return (
-        db.query(models.Task)
-        .filter(
-            models.Task.iteration_id == iteration_id,
-            models.Task.status == "pending"
-        )
-        .order_by(models.Task.id)
-        .first()
+_GET_TASK = select(models.Task).where(models.Task.id == bindparam("id"))
+
+
+async def get_task(db: AsyncSession, task_id: int) -> Optional[models.Task]:
+    return await db.scalar(_GET_TASK, {"id": task_id})
+
+
+_CLAIM_TASK = (
+    select(models.Task)
+    .where(
+        models.Task.id == bindparam("id"),
+        models.Task.status == literal_column("'pending'")
+    )
+    .with_for_update(skip_locked=True)
+    # The session may already hold this task, e.g. just created by the
+    # previous step; take the locked row's values over the stale ones
+    .execution_options(populate_existing=True)
+)
+
+
+async def claim_task(db: AsyncSession, task_id: int) -> Optional[models.Task]:
+    """
+    Lock a pending task, mark it running and count the attempt, in one
+    short transaction.
+
+    None if the task doesn't exist, isn't pending or is locked by another
+    session, so duplicate jobs for the same task never both run it.
+    """
+    task = await db.scalar(_CLAIM_TASK, {"id": task_id})
+    if task is None:
+        return None
+    task.status = "running"
+    task.attempts += 1
+    task.locked_at = datetime.now(timezone.utc)
+    await db.commit()
+    return task
+
+
+# 'pending' is rendered inline so the query keeps matching the partial
+# index's predicate once prepared statements go generic
+_GET_PENDING_TASK = (
+    select(models.Task)
+    .where(
+        models.Task.iteration_id == bindparam("iteration_id"),
+        models.Task.status == literal_column("'pending'")
     )
+    .order_by(models.Task.id)
+    .limit(1)
+    # Concurrent pollers skip rows already claimed; the lock is held until commit
+    .with_for_update(skip_locked=True)
+)
 
+async def get_pending_task(db: AsyncSession, iteration_id: int) -> Optional[models.Task]:
+    return await db.scalar(_GET_PENDING_TASK, {"iteration_id": iteration_id})
 
-def update_task(
-    db: Session,
+
+async def update_task(
+    db: AsyncSession,
     task_id: int,
     status: str = None,
     output_jsonb: dict = None,
     attempts: int = None
 ) -> Optional[models.Task]:
-    db_task = get_task(db, task_id)
-    if db_task:
-        if status is not None:
-            db_task.status = status
-        if output_jsonb is not None:
-            db_task.output_jsonb = output_jsonb
-        if attempts is not None:
-            db_task.attempts = attempts
-        db.commit()
-        db.refresh(db_task)
-    return db_task
+    update_data = {}
+    if status is not None:
+        update_data["status"] = status
+    if output_jsonb is not None:
+        update_data["output_jsonb"] = output_jsonb
+    if attempts is not None:
+        update_data["attempts"] = attempts
+    return await _update_by_id(db, models.Task, task_id, update_data)
 
 
 # ============================================================================
 # CheckRun CRUD
 # ============================================================================
 
-def create_check_run(
-    db: Session,
+async def create_check_run(
+    db: AsyncSession,
     iteration_id: int,
     draft_id: int,
     check_type: str,
     passed: bool,
     findings_jsonb: Optional[list] = None
 ) -> models.CheckRun:
-    db_check_run = models.CheckRun(
-        iteration_id=iteration_id,
-        draft_id=draft_id,
-        check_type=check_type,
-        passed=passed,
-        findings_jsonb=findings_jsonb or []
-    )
-    db.add(db_check_run)
-    db.commit()
-    db.refresh(db_check_run)
+    values = {
+        "iteration_id": iteration_id,
+        "draft_id": draft_id,
+        "check_type": check_type,
+        "passed": passed
+    }
+    if findings_jsonb is not None:
+        values["findings_jsonb"] = findings_jsonb
+    db_check_run = await db.scalar(
+        insert(models.CheckRun).values(**values).returning(models.CheckRun)
+    )
+    await db.commit()
     return db_check_run
 
 
+async def create_check_runs(
+    db: AsyncSession,
+    iteration_id: int,
+    draft_id: int,
+    check_runs: list[dict],
+    commit: bool = True
+) -> list[models.CheckRun]:
+    """Insert several check runs in one executemany round trip and a single commit."""
+    if not check_runs:
+        return []
+    rows = [
+        {
+            "iteration_id": iteration_id,
+            "draft_id": draft_id,
+            "check_type": run["check_type"],
+            "passed": run["passed"],
+            "findings_jsonb": run.get("findings_jsonb") or []
+        }
+        for run in check_runs
+    ]
+    db_check_runs = (
+        await db.scalars(
+            insert(models.CheckRun).returning(models.CheckRun, sort_by_parameter_order=True),
+            rows
+        )
+    ).all()
+    if commit:
+        await db.commit()
+    return db_check_runs
+
+
 # ============================================================================
 # Fact CRUD
 # ============================================================================
 
-def create_fact(
-    db: Session,
+async def create_fact(
+    db: AsyncSession,
     source_draft_id: int,
     fact: schemas.FactBase
 ) -> models.Fact:
-    db_fact = models.Fact(
-        source_draft_id=source_draft_id,
-        **fact.model_dump()
+    db_fact = await db.scalar(
+        insert(models.Fact)
+        .values(
+            source_draft_id=source_draft_id,
+            **fact.model_dump()
+        )
+        .returning(models.Fact)
     )
-    db.add(db_fact)
-    db.commit()
-    db.refresh(db_fact)
+    await db.commit()
     return db_fact
 
 
-def get_facts_for_draft(db: Session, draft_id: int) -> list[models.Fact]:
+_FACT_COPY_COLUMNS = (
+    "id", "source_draft_id", "fact_type", "subject_type", "subject_id",
+    "predicate", "object_jsonb", "confidence",
+)
+
+
+async def _copy_facts(
+    db: AsyncSession,
+    source_draft_id: int,
+    facts: list[schemas.FactBase],
+    embeddings: Optional[list[Sequence[float]]] = None
+) -> list[int]:
+    """
+    Stream facts into the table with COPY on the session's own connection.
+
+    Embeddings go out in pgvector's binary format rather than as text;
+    register_vector installs the codec for both vector and halfvec columns
+    (halfvec since migration 019).
+    """
+    # COPY returns nothing, so IDs are drawn from the sequence up front
+    fact_ids = (
+        await db.scalars(
+            select(func.nextval(func.pg_get_serial_sequence("fact", "id")))
+            .select_from(func.generate_series(1, len(facts)))
+        )
+    ).all()
+    records = [
+        (
+            fact_id, source_draft_id, fact.fact_type, fact.subject_type, fact.subject_id,
+            fact.predicate, orjson.dumps(fact.object_jsonb).decode(), fact.confidence,
+        )
+        for fact_id, fact in zip(fact_ids, facts)
+    ]
+    columns = _FACT_COPY_COLUMNS
+    conn = await db.connection()
+    driver_conn = (await conn.get_raw_connection()).driver_connection
+    if embeddings is not None:
+        # The vector type only exists where pgvector is installed (migration 002)
+        await register_vector(driver_conn)
+        columns += ("embedding",)
+        records = [record + (embedding,) for record, embedding in zip(records, embeddings)]
+    await driver_conn.copy_records_to_table("fact", records=records, columns=columns)
+    return list(fact_ids)
+
+
+async def create_facts(
+    db: AsyncSession,
+    source_draft_id: int,
+    facts: list[schemas.FactBase],
+    embeddings: Optional[list[Sequence[float]]] = None,
+    commit: bool = True
+) -> list[int]:
+    """
+    Insert several facts in a single commit and return their IDs in order.
+
+    Small batches use one executemany INSERT; large ones, and any batch
+    carrying embeddings (one per fact, in order), are sent with COPY so the
+    vectors are stored in the same round trip as their rows.
+    """
+    if not facts:
+        return []
+    if embeddings is not None and len(embeddings) != len(facts):
+        raise ValueError("Expected one embedding per fact")
+    if embeddings is not None or len(facts) >= FACT_COPY_THRESHOLD:
+        fact_ids = await _copy_facts(db, source_draft_id, facts, embeddings)
+    else:
+        rows = [{"source_draft_id": source_draft_id, **fact.model_dump()} for fact in facts]
+        fact_ids = (
+            await db.scalars(
+                insert(models.Fact).returning(models.Fact.id, sort_by_parameter_order=True),
+                rows
+            )
+        ).all()
+    if commit:
+        await db.commit()
+    return list(fact_ids)
+
+
+_GET_FACTS_WITHOUT_EMBEDDING = (
+    select(models.Fact.__table__)
+    .where(literal_column("embedding").is_(None), models.Fact.id > bindparam("after_id"))
+    .order_by(models.Fact.id)
+    .limit(bindparam("limit"))
+)
+
+
+async def backfill_fact_embeddings(
+    db: AsyncSession,
+    embed: Callable[[list[RowMapping]], list[Sequence[float]]],
+    batch_size: int = FACT_EMBEDDING_BATCH_SIZE
+) -> int:
+    """
+    Fill in fact.embedding where it is NULL and return how many rows were set.
+
+    Facts are walked by ID in keyset pages; embed() turns each page of fact
+    rows into one vector per row, and every page is written with a single
+    executemany UPDATE and committed on its own, so locks are held for one
+    batch at a time and an interrupted run resumes where it stopped.
+
+    The pgvector codec is registered once, on the session's connection, so
+    db must keep that connection across commits: bind it to an
+    AsyncConnection, as app.backfill does.
+    """
+    conn = await db.connection()
+    driver_conn = (await conn.get_raw_connection()).driver_connection
+    await register_vector(driver_conn)
+    updated = 0
+    after_id = 0
+    while True:
+        facts = (
+            await db.execute(
+                _GET_FACTS_WITHOUT_EMBEDDING, {"after_id": after_id, "limit": batch_size}
+            )
+        ).mappings().all()
+        if not facts:
+            return updated
+        embeddings = embed(facts)
+        if len(embeddings) != len(facts):
+            raise ValueError("Expected one embedding per fact")
+        await driver_conn.executemany(
+            "UPDATE fact SET embedding = $2 WHERE id = $1",
+            [(fact["id"], embedding) for fact, embedding in zip(facts, embeddings)]
+        )
+        await db.commit()
+        updated += len(facts)
+        after_id = facts[-1]["id"]
+
+
+async def get_facts_for_draft(db: AsyncSession, draft_id: int) -> list[models.Fact]:
+    return (
+        await db.scalars(
+            select(models.Fact).where(models.Fact.source_draft_id == draft_id)
+        )
+    ).all()
+
+
+# The threshold is rendered inline rather than bound, so the planner can
+# match it against the ix_fact_low_confidence predicate even under a
+# generic plan.
+_GET_LOW_CONFIDENCE_FACTS = (
+    select(
+        models.Fact.fact_type,
+        models.Fact.predicate,
+        models.Fact.confidence
+    )
+    .where(
+        models.Fact.source_draft_id == bindparam("draft_id"),
+        models.Fact.confidence < literal_column("0.7")
+    )
+    .order_by(models.Fact.id)
+)
+
+
+async def get_low_confidence_facts(db: AsyncSession, draft_id: int) -> list[RowMapping]:
+    """Facts of a draft extracted with confidence below 0.7, via a partial index."""
+    return (
+        await db.execute(_GET_LOW_CONFIDENCE_FACTS, {"draft_id": draft_id})
+    ).mappings().all()
+
+
+def _build_contradicting_facts() -> Select:
+    current = aliased(models.Fact)
+    current_scene = aliased(models.Scene)
+    previous_scene = aliased(models.Scene)
+    latest = models.latest_fact_per_scene
     return (
-        db.query(models.Fact)
-        .filter(models.Fact.source_draft_id == draft_id)
-        .all()
+        select(
+            current.predicate,
+            current.object_jsonb.label("current_object"),
+            latest.c.object_jsonb.label("previous_object")
+        )
+        .select_from(current)
+        .join(current_scene, current_scene.id == bindparam("scene_id"))
+        .join(
+            latest,
+            and_(
+                latest.c.project_id == current_scene.project_id,
+                latest.c.subject_type == current.subject_type,
+                latest.c.subject_id.is_not_distinct_from(current.subject_id),
+                latest.c.predicate == current.predicate,
+                latest.c.object_hash != current.object_hash
+            )
+        )
+        .join(previous_scene, previous_scene.id == latest.c.scene_id)
+        .where(
+            current.source_draft_id == bindparam("draft_id"),
+            tuple_(previous_scene.chapter_no, previous_scene.scene_no)
+            < tuple_(current_scene.chapter_no, current_scene.scene_no)
+        )
+        .order_by(current.id, latest.c.fact_id)
     )
 
 
+_GET_CONTRADICTING_FACTS = _build_contradicting_facts()
+
+
+async def get_contradicting_facts(
+    db: AsyncSession,
+    draft_id: int,
+    scene_id: int
+) -> list[RowMapping]:
+    """
+    Pair each fact of a draft with the latest facts of earlier scenes in the
+    same project on the same subject and predicate whose object differs.
+
+    Earlier scenes are read from the latest_fact_per_scene materialized view,
+    so the lookup scales with the canonical timeline rather than with every
+    fact ever extracted. Rows carry the predicate plus the current_object and
+    previous_object.
+    """
+    return (
+        await db.execute(
+            _GET_CONTRADICTING_FACTS, {"draft_id": draft_id, "scene_id": scene_id}
+        )
+    ).mappings().all()
+
+
+async def refresh_latest_facts(db: AsyncSession) -> None:
+    """Rebuild latest_fact_per_scene without blocking readers of the view."""
+    await db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY latest_fact_per_scene"))
+    await db.commit()
+
+
 # ============================================================================
 # Constraint CRUD
 # ============================================================================
 
-def create_constraint(
-    db: Session,
+async def create_constraint(
+    db: AsyncSession,
     project_id: int,
     constraint: schemas.ConstraintCreate
 ) -> models.Constraint:
-    db_constraint = models.Constraint(
-        project_id=project_id,
-        **constraint.model_dump()
+    db_constraint = await db.scalar(
+        insert(models.Constraint)
+        .values(
+            project_id=project_id,
+            **constraint.model_dump()
+        )
+        .returning(models.Constraint)
     )
-    db.add(db_constraint)
-    db.commit()
-    db.refresh(db_constraint)
+    await db.commit()
     return db_constraint
 
 
-def get_constraints(db: Session, project_id: int) -> list[models.Constraint]:
+async def get_constraints(db: AsyncSession, project_id: int) -> list[models.Constraint]:
     return (
-        db.query(models.Constraint)
-        .filter(models.Constraint.project_id == project_id)
-        .all()
+        await db.scalars(
+            select(models.Constraint).where(models.Constraint.project_id == project_id)
+        )
+    ).all()
+
+
+_GET_CONSTRAINTS_BY_RULE_TYPE = (
+    select(models.Constraint)
+    .where(
+        models.Constraint.project_id == bindparam("project_id"),
+        models.Constraint.constraint_type == bindparam("constraint_type"),
+        # Literal key so the predicate matches the index expression
+        models.Constraint.rule_jsonb[literal_column("'type'")].astext == bindparam("rule_type")
     )
+    .order_by(models.Constraint.id)
+)
+
+
+async def get_constraints_by_rule_type(
+    db: AsyncSession,
+    project_id: int,
+    constraint_type: str,
+    rule_type: str
+) -> list[models.Constraint]:
+    """Constraints of one kind whose rule_jsonb 'type' matches, via ix_constraint_rule_type."""
+    return (
+        await db.scalars(
+            _GET_CONSTRAINTS_BY_RULE_TYPE,
+            {"project_id": project_id, "constraint_type": constraint_type, "rule_type": rule_type}
+        )
+    ).all()
+
+
+# The scene row plus, through subqueries correlated on its project, the
+# latest style bible's content and the matching constraints pre-built as
+# JSON objects (an empty array when there are none)
+_GET_SCENE_CHECK_CONTEXT = (
+    select(
+        models.Scene,
+        select(models.StyleBible.content_jsonb)
+        .where(models.StyleBible.project_id == models.Scene.project_id)
+        .order_by(models.StyleBible.version.desc())
+        .limit(1)
+        .correlate(models.Scene)
+        .scalar_subquery(),
+        select(
+            func.coalesce(
+                func.jsonb_agg(
+                    aggregate_order_by(
+                        func.jsonb_build_object(
+                            literal_column("'id'"), models.Constraint.id,
+                            literal_column("'constraint_type'"), models.Constraint.constraint_type,
+                            literal_column("'rule_jsonb'"), models.Constraint.rule_jsonb,
+                            literal_column("'severity'"), models.Constraint.severity
+                        ),
+                        models.Constraint.id
+                    )
+                ),
+                literal_column("'[]'::jsonb"),
+                type_=JSONB
+            )
+        )
+        .where(
+            models.Constraint.project_id == models.Scene.project_id,
+            models.Constraint.constraint_type == bindparam("constraint_type"),
+            models.Constraint.rule_jsonb[literal_column("'type'")].astext == bindparam("rule_type")
+        )
+        .correlate(models.Scene)
+        .scalar_subquery()
+    )
+    .options(raiseload("*"))
+    .where(models.Scene.id == bindparam("id"))
+)
+
+
+async def get_scene_check_context(
+    db: AsyncSession,
+    scene_id: int,
+    constraint_type: str,
+    rule_type: str
+) -> Optional[tuple[models.Scene, list[dict], Optional[dict]]]:
+    """
+    Everything a check run needs about a scene in one round trip: the
+    scene, its project's constraints filtered as in
+    get_constraints_by_rule_type (as dicts of id, constraint_type,
+    rule_jsonb and severity), and the latest style bible's content.
+    None if the scene doesn't exist.
+    """
+    row = (
+        await db.execute(
+            _GET_SCENE_CHECK_CONTEXT,
+            {"id": scene_id, "constraint_type": constraint_type, "rule_type": rule_type}
+        )
+    ).first()
+    if row is None:
+        return None
+    scene, style_bible, constraints = row
+    return scene, constraints, style_bible
@@ -1,11 +1,18 @@
 """
 FastAPI application for the System-2 Novel Engine.
 """
+import hashlib
 from pathlib import Path
-from fastapi import FastAPI, Depends, HTTPException, status
+from typing import Optional
+import orjson
+from cachetools import TTLCache
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response, status
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
-from sqlalchemy.orm import Session
+from fastapi.responses import HTMLResponse, ORJSONResponse, StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import RowMapping
+from sqlalchemy.ext.asyncio import AsyncMappingResult, AsyncSession
 
 from app.db import get_db
 from app import crud, schemas, models
@@ -15,7 +22,8 @@ from app.services import pipeline
 app = FastAPI(
     title="System-2 Novel Engine",
     description="A production-minded MVP for novel writing with relational graph index and iterative drafting pipeline.",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=ORJSONResponse
 )
 
 # Mount Static Files
@@ -23,12 +31,94 @@ BASE_DIR = Path(__file__).resolve().parent
 STATIC_DIR = BASE_DIR / "static"
 app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 
+# The SPA shell is static, so it is read once at import and served from memory
+INDEX_HTML = (STATIC_DIR / "index.html").read_bytes()
+INDEX_ETAG = f'"{hashlib.sha256(INDEX_HTML).hexdigest()[:32]}"'
+INDEX_HEADERS = {"ETag": INDEX_ETAG, "Cache-Control": "public, max-age=300"}
+
+
 @app.get("/", response_class=HTMLResponse)
-async def read_root():
+async def read_root(request: Request):
     """Serve the single-page application."""
-    index_path = STATIC_DIR / "index.html"
-    with open(index_path, "r") as f:
-        return f.read()
+    if request.headers.get("if-none-match") == INDEX_ETAG:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=INDEX_HEADERS)
+    return HTMLResponse(content=INDEX_HTML, headers=INDEX_HEADERS)
+
+
+# In-process caches of Read-schema snapshots for the hottest point lookups.
+# Entries also expire, so other workers' writes and deletes show up here; drafts
+# never change once written, so theirs live longer and only a cascade delete
+# (which this worker clears on, and others wait out) can make them stale.
+draft_cache: TTLCache = TTLCache(maxsize=4096, ttl=300)
+project_cache: TTLCache = TTLCache(maxsize=1024, ttl=30)
+scene_cache: TTLCache = TTLCache(maxsize=1024, ttl=30)
+
+# Drafts never change once written, so clients may keep them too
+IMMUTABLE_CACHE_CONTROL = "public, max-age=3600, immutable"
+
+# Bounds for the `limit` query parameter of the paginated list endpoints
+MAX_PAGE_SIZE = 1000
+
+
+# Read-schema adapters for responses built from ORM objects; validation and
+# JSON encoding of the whole payload each run once inside pydantic-core.
+CONSTRAINT_LIST = TypeAdapter(list[schemas.ConstraintRead])
+ITERATION_READ = TypeAdapter(schemas.IterationRead)
+
+
+def _json_response(adapter: TypeAdapter, obj) -> Response:
+    """Encode ORM objects through a Read-schema adapter."""
+    return Response(
+        adapter.dump_json(adapter.validate_python(obj, from_attributes=True)),
+        media_type="application/json"
+    )
+
+
+# SQLSTATE raised when an INSERT references a missing parent row
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+def _violates_fk(exc: IntegrityError, constraint_name: str) -> bool:
+    """Whether an IntegrityError was raised by the given foreign key."""
+    orig = exc.orig
+    # asyncpg chains its own exception, which carries the constraint name
+    return (
+        getattr(orig, "pgcode", None) == FOREIGN_KEY_VIOLATION
+        and getattr(orig.__cause__, "constraint_name", None) == constraint_name
+    )
+
+
+def _encode_row(row: RowMapping) -> bytes:
+    """JSON-encode a row; UTC timestamps end in Z, as pydantic writes them."""
+    return orjson.dumps(dict(row), option=orjson.OPT_UTC_Z)
+
+
+def _stream_page(
+    first: Optional[RowMapping],
+    rows: AsyncMappingResult,
+    limit: int
+) -> StreamingResponse:
+    """
+    Stream a keyset-paginated result as a Page JSON body.
+
+    Rows are plain column mappings encoded straight to orjson while the
+    server-side cursor is still fetching; the last row's ID becomes
+    next_cursor once the page turns out to be full. `first` is the row the
+    caller already pulled to decide on a 404.
+    """
+    async def body():
+        yield b'{"items":['
+        last, count = first, 0
+        if first is not None:
+            yield _encode_row(first)
+            count = 1
+            async for row in rows:
+                yield b"," + _encode_row(row)
+                last, count = row, count + 1
+        next_cursor = last["id"] if last is not None and count == limit else None
+        yield b'],"next_cursor":' + orjson.dumps(next_cursor) + b"}"
+
+    return StreamingResponse(body(), media_type="application/json")
 
 
 # ============================================================================
@@ -46,31 +136,44 @@ def health_check():
 # ============================================================================
 
 @app.post("/projects", response_model=schemas.ProjectRead, status_code=status.HTTP_201_CREATED)
-def create_project(project: schemas.ProjectCreate, db: Session = Depends(get_db)):
+async def create_project(project: schemas.ProjectCreate, db: AsyncSession = Depends(get_db)):
     """Create a new project."""
-    return crud.create_project(db, project)
+    return await crud.create_project(db, project)
 
 
-@app.get("/projects", response_model=list[schemas.ProjectRead])
-def list_projects(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """List all projects."""
-    return crud.get_projects(db, skip=skip, limit=limit)
+@app.get("/projects", response_model=schemas.Page[schemas.ProjectRead])
+async def list_projects(
+    after_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """List projects, ordered by ID."""
+    projects = await crud.get_projects(db, after_id=after_id, limit=limit)
+    first = await anext(projects, None)
+    return _stream_page(first, projects, limit)
 
 
 @app.get("/projects/{project_id}", response_model=schemas.ProjectRead)
-def get_project(project_id: int, db: Session = Depends(get_db)):
+async def get_project(project_id: int, db: AsyncSession = Depends(get_db)):
     """Get a project by ID."""
-    project = crud.get_project(db, project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    project = project_cache.get(project_id)
+    if project is None:
+        db_project = await crud.get_project(db, project_id)
+        if not db_project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        project = project_cache[project_id] = schemas.ProjectRead.model_validate(db_project)
     return project
 
 
 @app.delete("/projects/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_project(project_id: int, db: Session = Depends(get_db)):
+async def delete_project(project_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a project."""
-    if not crud.delete_project(db, project_id):
+    if not await crud.delete_project(db, project_id):
         raise HTTPException(status_code=404, detail="Project not found")
+    # The delete cascades to scenes and drafts we can't enumerate cheaply
+    project_cache.pop(project_id, None)
+    scene_cache.clear()
+    draft_cache.clear()
     return None
 
 
@@ -83,58 +186,61 @@ def delete_project(project_id: int, db: Session = Depends(get_db)):
     response_model=schemas.CharacterRead,
     status_code=status.HTTP_201_CREATED
 )
-def create_character(
+async def create_character(
     project_id: int,
     character: schemas.CharacterCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new character in a project."""
-    project = crud.get_project(db, project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    return crud.create_character(db, project_id, character)
+    try:
+        return await crud.create_character(db, project_id, character)
+    except IntegrityError as e:
+        if _violates_fk(e, "character_project_id_fkey"):
+            raise HTTPException(status_code=404, detail="Project not found")
+        raise
 
 
-@app.get("/projects/{project_id}/characters", response_model=list[schemas.CharacterRead])
-def list_characters(
+@app.get("/projects/{project_id}/characters", response_model=schemas.Page[schemas.CharacterRead])
+async def list_characters(
     project_id: int,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    after_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
 ):
     """List all characters in a project."""
-    project = crud.get_project(db, project_id)
-    if not project:
+    characters = await crud.get_characters(db, project_id, after_id=after_id, limit=limit)
+    first = await anext(characters, None)
+    if first is None and not await crud.project_exists(db, project_id):
         raise HTTPException(status_code=404, detail="Project not found")
-    return crud.get_characters(db, project_id, skip=skip, limit=limit)
+    return _stream_page(first, characters, limit)
 
 
 @app.get("/characters/{character_id}", response_model=schemas.CharacterRead)
-def get_character(character_id: int, db: Session = Depends(get_db)):
+async def get_character(character_id: int, db: AsyncSession = Depends(get_db)):
     """Get a character by ID."""
-    character = crud.get_character(db, character_id)
+    character = await crud.get_character(db, character_id)
     if not character:
         raise HTTPException(status_code=404, detail="Character not found")
     return character
 
 
 @app.put("/characters/{character_id}", response_model=schemas.CharacterRead)
-def update_character(
+async def update_character(
     character_id: int,
     character: schemas.CharacterUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a character."""
-    updated = crud.update_character(db, character_id, character)
+    updated = await crud.update_character(db, character_id, character)
     if not updated:
         raise HTTPException(status_code=404, detail="Character not found")
     return updated
 
 
 @app.delete("/characters/{character_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_character(character_id: int, db: Session = Depends(get_db)):
+async def delete_character(character_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a character."""
-    if not crud.delete_character(db, character_id):
+    if not await crud.delete_character(db, character_id):
         raise HTTPException(status_code=404, detail="Character not found")
     return None
 
@@ -148,59 +254,69 @@ def delete_character(character_id: int, db: Session = Depends(get_db)):
     response_model=schemas.SceneRead,
     status_code=status.HTTP_201_CREATED
 )
-def create_scene(
+async def create_scene(
     project_id: int,
     scene: schemas.SceneCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new scene in a project."""
-    project = crud.get_project(db, project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    return crud.create_scene(db, project_id, scene)
+    try:
+        return await crud.create_scene(db, project_id, scene)
+    except IntegrityError as e:
+        if _violates_fk(e, "scene_project_id_fkey"):
+            raise HTTPException(status_code=404, detail="Project not found")
+        raise
 
 
-@app.get("/projects/{project_id}/scenes", response_model=list[schemas.SceneRead])
-def list_scenes(
+@app.get("/projects/{project_id}/scenes", response_model=schemas.Page[schemas.SceneRead])
+async def list_scenes(
     project_id: int,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    after_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
 ):
     """List all scenes in a project, ordered by chapter and scene number."""
-    project = crud.get_project(db, project_id)
-    if not project:
+    scenes = await crud.get_scenes(db, project_id, after_id=after_id, limit=limit)
+    first = await anext(scenes, None)
+    if first is None and not await crud.project_exists(db, project_id):
         raise HTTPException(status_code=404, detail="Project not found")
-    return crud.get_scenes(db, project_id, skip=skip, limit=limit)
+    return _stream_page(first, scenes, limit)
 
 
 @app.get("/scenes/{scene_id}", response_model=schemas.SceneRead)
-def get_scene(scene_id: int, db: Session = Depends(get_db)):
+async def get_scene(scene_id: int, db: AsyncSession = Depends(get_db)):
     """Get a scene by ID."""
-    scene = crud.get_scene(db, scene_id)
-    if not scene:
-        raise HTTPException(status_code=404, detail="Scene not found")
+    scene = scene_cache.get(scene_id)
+    if scene is None:
+        db_scene = await crud.get_scene(db, scene_id)
+        if not db_scene:
+            raise HTTPException(status_code=404, detail="Scene not found")
+        scene = scene_cache[scene_id] = schemas.SceneRead.model_validate(db_scene)
     return scene
 
 
 @app.put("/scenes/{scene_id}", response_model=schemas.SceneRead)
-def update_scene(
+async def update_scene(
     scene_id: int,
     scene: schemas.SceneUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a scene."""
-    updated = crud.update_scene(db, scene_id, scene)
+    updated = await crud.update_scene(db, scene_id, scene)
+    scene_cache.pop(scene_id, None)
     if not updated:
         raise HTTPException(status_code=404, detail="Scene not found")
     return updated
 
 
 @app.delete("/scenes/{scene_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_scene(scene_id: int, db: Session = Depends(get_db)):
+async def delete_scene(scene_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a scene."""
-    if not crud.delete_scene(db, scene_id):
+    if not await crud.delete_scene(db, scene_id):
         raise HTTPException(status_code=404, detail="Scene not found")
+    # The delete cascades to drafts we can't enumerate cheaply
+    scene_cache.pop(scene_id, None)
+    draft_cache.clear()
     return None
 
 
@@ -213,38 +329,45 @@ def delete_scene(scene_id: int, db: Session = Depends(get_db)):
     response_model=schemas.DraftRead,
     status_code=status.HTTP_201_CREATED
 )
-def create_draft(
+async def create_draft(
     scene_id: int,
     draft: schemas.DraftCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new draft for a scene (append-only)."""
-    scene = crud.get_scene(db, scene_id)
-    if not scene:
-        raise HTTPException(status_code=404, detail="Scene not found")
-    return crud.create_draft(db, scene_id, draft)
+    try:
+        return await crud.create_draft(db, scene_id, draft)
+    except IntegrityError as e:
+        if _violates_fk(e, "draft_scene_id_fkey"):
+            raise HTTPException(status_code=404, detail="Scene not found")
+        raise
 
 
-@app.get("/scenes/{scene_id}/drafts", response_model=list[schemas.DraftRead])
-def list_drafts(
+@app.get("/scenes/{scene_id}/drafts", response_model=schemas.Page[schemas.DraftRead])
+async def list_drafts(
     scene_id: int,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    after_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
 ):
     """List all drafts for a scene, ordered by version descending."""
-    scene = crud.get_scene(db, scene_id)
-    if not scene:
+    drafts = await crud.get_drafts(db, scene_id, after_id=after_id, limit=limit)
+    first = await anext(drafts, None)
+    if first is None and not await crud.scene_exists(db, scene_id):
         raise HTTPException(status_code=404, detail="Scene not found")
-    return crud.get_drafts(db, scene_id, skip=skip, limit=limit)
+    return _stream_page(first, drafts, limit)
 
 
 @app.get("/drafts/{draft_id}", response_model=schemas.DraftRead)
-def get_draft(draft_id: int, db: Session = Depends(get_db)):
+async def get_draft(draft_id: int, response: Response, db: AsyncSession = Depends(get_db)):
     """Get a draft by ID."""
-    draft = crud.get_draft(db, draft_id)
-    if not draft:
-        raise HTTPException(status_code=404, detail="Draft not found")
+    draft = draft_cache.get(draft_id)
+    if draft is None:
+        db_draft = await crud.get_draft(db, draft_id)
+        if not db_draft:
+            raise HTTPException(status_code=404, detail="Draft not found")
+        draft = draft_cache[draft_id] = schemas.DraftRead.model_validate(db_draft)
+    response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
     return draft
 
 
@@ -256,10 +379,10 @@ def get_draft(draft_id: int, db: Session = Depends(get_db)):
     "/pipeline/scenes/{scene_id}/run",
     response_model=schemas.PipelineRunResponse
 )
-def run_pipeline(
+async def run_pipeline(
     scene_id: int,
     request: schemas.PipelineRunRequest = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Start a pipeline iteration for a scene.
@@ -268,20 +391,20 @@ def run_pipeline(
     """
     request = request or schemas.PipelineRunRequest()
     
-    scene = crud.get_scene(db, scene_id)
+    scene = await crud.get_scene(db, scene_id)
     if not scene:
         raise HTTPException(status_code=404, detail="Scene not found")
     
     # Validate draft_id if provided
     if request.draft_id:
-        draft = crud.get_draft(db, request.draft_id)
+        draft = await crud.get_draft(db, request.draft_id)
         if not draft:
             raise HTTPException(status_code=404, detail="Draft not found")
         if draft.scene_id != scene_id:
             raise HTTPException(status_code=400, detail="Draft does not belong to this scene")
     
     try:
-        iteration = pipeline.start_iteration(
+        iteration = await pipeline.start_iteration(
             db,
             scene_id=scene_id,
             max_attempts=request.max_attempts,
@@ -297,20 +420,52 @@ def run_pipeline(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.post(
+    "/pipeline/scenes/run",
+    response_model=list[schemas.PipelineRunResponse]
+)
+async def run_pipelines(
+    request: schemas.PipelineBatchRunRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Start a pipeline iteration for each of several scenes, e.g. a whole chapter.
+    
+    All first tasks are created and enqueued together.
+    """
+    try:
+        iterations = await pipeline.start_iterations(
+            db,
+            scene_ids=request.scene_ids,
+            max_attempts=request.max_attempts
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    return [
+        schemas.PipelineRunResponse(
+            iteration_id=iteration.id,
+            status=iteration.status,
+            message=f"Pipeline started for scene {iteration.scene_id}, iteration {iteration.iteration_no}"
+        )
+        for iteration in iterations
+    ]
+
+
 @app.get(
     "/pipeline/iterations/{iteration_id}",
     response_model=schemas.IterationRead
 )
-def get_iteration(iteration_id: int, db: Session = Depends(get_db)):
+async def get_iteration(iteration_id: int, db: AsyncSession = Depends(get_db)):
     """
     Get the status of a pipeline iteration.
     
     Includes the latest draft and all check runs.
     """
-    iteration = crud.get_iteration(db, iteration_id)
+    iteration = await crud.get_iteration(db, iteration_id)
     if not iteration:
         raise HTTPException(status_code=404, detail="Iteration not found")
-    return iteration
+    return _json_response(ITERATION_READ, iteration)
 
 
 # ============================================================================
@@ -322,22 +477,24 @@ def get_iteration(iteration_id: int, db: Session = Depends(get_db)):
     response_model=schemas.ConstraintRead,
     status_code=status.HTTP_201_CREATED
 )
-def create_constraint(
+async def create_constraint(
     project_id: int,
     constraint: schemas.ConstraintCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new constraint for a project."""
-    project = crud.get_project(db, project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    return crud.create_constraint(db, project_id, constraint)
+    try:
+        return await crud.create_constraint(db, project_id, constraint)
+    except IntegrityError as e:
+        if _violates_fk(e, "story_constraint_project_id_fkey"):
+            raise HTTPException(status_code=404, detail="Project not found")
+        raise
 
 
 @app.get("/projects/{project_id}/constraints", response_model=list[schemas.ConstraintRead])
-def list_constraints(project_id: int, db: Session = Depends(get_db)):
+async def list_constraints(project_id: int, db: AsyncSession = Depends(get_db)):
     """List all constraints for a project."""
-    project = crud.get_project(db, project_id)
-    if not project:
+    constraints = await crud.get_constraints(db, project_id)
+    if not constraints and not await crud.project_exists(db, project_id):
         raise HTTPException(status_code=404, detail="Project not found")
-    return crud.get_constraints(db, project_id)
+    return _json_response(CONSTRAINT_LIST, constraints)
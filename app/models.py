@@ -1,11 +1,10 @@
 """
 SQLAlchemy models for the System-2 Novel Engine.
 """
-from datetime import datetime, timezone
 from typing import Optional
 from sqlalchemy import (
-    Column, Integer, String, Text, DateTime, ForeignKey, 
-    Boolean, Float, Index, UniqueConstraint
+    BigInteger, CheckConstraint, Column, Integer, String, Text, DateTime, ForeignKey, Identity,
+    Boolean, Enum, Float, Index, UniqueConstraint, FetchedValue, column, func, table, text
 )
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
@@ -13,22 +12,21 @@ from sqlalchemy.orm import relationship
 from app.db import Base
 
 
-def utc_now():
-    """Return current UTC time as timezone-aware datetime."""
-    return datetime.now(timezone.utc)
+# Timestamps come from the database clock: now() is filled in server-side on
+# INSERT and rendered into every UPDATE, so no Python datetime is built per row.
 
 
 class Project(Base):
     """A novel project."""
     __tablename__ = "project"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, Identity(), primary_key=True)
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
-    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
-    # Relationships
+    # Relationships (large fan-out; left lazy and guarded by raiseload in crud)
     style_bibles = relationship("StyleBible", back_populates="project", cascade="all, delete-orphan")
     characters = relationship("Character", back_populates="project", cascade="all, delete-orphan")
     locations = relationship("Location", back_populates="project", cascade="all, delete-orphan")
@@ -41,11 +39,11 @@ class StyleBible(Base):
     """Versioned style guide for a project."""
     __tablename__ = "style_bible"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, Identity(), primary_key=True)
     project_id = Column(Integer, ForeignKey("project.id", ondelete="CASCADE"), nullable=False)
     version = Column(Integer, nullable=False, default=1)
     content_jsonb = Column(JSONB, nullable=False, default=dict)
-    created_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     project = relationship("Project", back_populates="style_bibles")
 
@@ -58,43 +56,51 @@ class Character(Base):
     """A character in the novel."""
     __tablename__ = "character"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, Identity(), primary_key=True)
     project_id = Column(Integer, ForeignKey("project.id", ondelete="CASCADE"), nullable=False)
     name = Column(String(255), nullable=False)
     data_jsonb = Column(JSONB, nullable=False, default=dict)
-    created_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
-    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     project = relationship("Project", back_populates="characters")
     pov_scenes = relationship("Scene", back_populates="pov_character")
 
+    __table_args__ = (
+        Index("ix_character_project", "project_id", "id"),
+    )
+
 
 class Location(Base):
     """A location in the novel."""
     __tablename__ = "location"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, Identity(), primary_key=True)
     project_id = Column(Integer, ForeignKey("project.id", ondelete="CASCADE"), nullable=False)
     name = Column(String(255), nullable=False)
     data_jsonb = Column(JSONB, nullable=False, default=dict)
-    created_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
-    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     project = relationship("Project", back_populates="locations")
 
+    __table_args__ = (
+        Index("ix_location_project", "project_id", "id"),
+    )
+
 
 class Scene(Base):
     """A scene in the novel."""
     __tablename__ = "scene"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, Identity(), primary_key=True)
     project_id = Column(Integer, ForeignKey("project.id", ondelete="CASCADE"), nullable=False)
     chapter_no = Column(Integer, nullable=False)
     scene_no = Column(Integer, nullable=False)
     pov_character_id = Column(Integer, ForeignKey("character.id", ondelete="SET NULL"), nullable=True)
     card_jsonb = Column(JSONB, nullable=False, default=dict)
-    created_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
-    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     project = relationship("Project", back_populates="scenes")
     pov_character = relationship("Character", back_populates="pov_scenes")
@@ -102,8 +108,15 @@ class Scene(Base):
     iterations = relationship("Iteration", back_populates="scene", cascade="all, delete-orphan")
 
     __table_args__ = (
-        Index("ix_scene_ordering", "project_id", "chapter_no", "scene_no"),
+        Index("ix_scene_project_chapter", "project_id", "chapter_no", "scene_no", "id"),
+        # B-tree on the extracted scalar for ->> equality lookups
+        Index("ix_scene_card_pov", project_id, card_jsonb["pov"].astext),
+        Index(
+            "ix_scene_pov_character", "pov_character_id",
+            postgresql_where=text("pov_character_id IS NOT NULL")
+        ),
         UniqueConstraint("project_id", "chapter_no", "scene_no", name="uq_scene_ordering"),
+        CheckConstraint("chapter_no >= 0 AND scene_no >= 0", name="ck_scene_ordering"),
     )
 
 
@@ -114,11 +127,11 @@ class Draft(Base):
     """
     __tablename__ = "draft"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigInteger, Identity(), primary_key=True)
     scene_id = Column(Integer, ForeignKey("scene.id", ondelete="CASCADE"), nullable=False)
     version = Column(Integer, nullable=False)
     text = Column(Text, nullable=False)
-    created_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     scene = relationship("Scene", back_populates="drafts")
     facts = relationship("Fact", back_populates="source_draft", cascade="all, delete-orphan")
@@ -126,6 +139,8 @@ class Draft(Base):
 
     __table_args__ = (
         UniqueConstraint("scene_id", "version", name="uq_draft_scene_version"),
+        # Matches DISTINCT ON (scene_id) ... ORDER BY scene_id, version DESC
+        Index("ix_draft_scene_version_desc", scene_id, version.desc()),
     )
 
 
@@ -133,14 +148,18 @@ class Event(Base):
     """A story event with timeline positioning."""
     __tablename__ = "event"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, Identity(), primary_key=True)
     project_id = Column(Integer, ForeignKey("project.id", ondelete="CASCADE"), nullable=False)
     story_time = Column(String(100), nullable=True)  # Flexible story-time representation
     data_jsonb = Column(JSONB, nullable=False, default=dict)
-    created_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     project = relationship("Project", back_populates="events")
 
+    __table_args__ = (
+        Index("ix_event_project", "project_id"),
+    )
+
 
 class Fact(Base):
     """
@@ -149,34 +168,82 @@ class Fact(Base):
     """
     __tablename__ = "fact"
 
-    id = Column(Integer, primary_key=True, index=True)
-    source_draft_id = Column(Integer, ForeignKey("draft.id", ondelete="CASCADE"), nullable=False)
+    id = Column(BigInteger, Identity(), primary_key=True)
+    source_draft_id = Column(BigInteger, ForeignKey("draft.id", ondelete="CASCADE"), nullable=False)
     fact_type = Column(String(50), nullable=False)  # e.g., "character_trait", "location_detail"
     subject_type = Column(String(50), nullable=False)  # e.g., "character", "location"
     subject_id = Column(Integer, nullable=True)  # FK to the subject entity
     predicate = Column(String(255), nullable=False)  # e.g., "has_eye_color", "is_located_in"
     object_jsonb = Column(JSONB, nullable=False, default=dict)
+    # SHA-256 of object_jsonb's canonical text, maintained by the fact_object_hash trigger
+    object_hash = Column(String(64), nullable=True, server_default=FetchedValue())
     confidence = Column(Float, nullable=False, default=1.0)
-    created_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
-    # Optional: embedding for semantic search (added via migration)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Optional: embedding for semantic search (added via migration 002 where
+    # pgvector is installed; written by crud.create_facts(embeddings=...) or
+    # filled in afterwards by crud.backfill_fact_embeddings)
     # embedding = Column(Vector(1536), nullable=True)
 
     source_draft = relationship("Draft", back_populates="facts")
 
+    __table_args__ = (
+        # Serves per-draft reads and the continuity join on the draft's facts;
+        # earlier scenes are matched through latest_fact_per_scene instead
+        Index(
+            "ix_fact_subject_predicate",
+            "source_draft_id", "subject_type", "subject_id", "predicate"
+        ),
+        # Only the few facts the continuity check warns about
+        Index(
+            "ix_fact_low_confidence", "source_draft_id", "id",
+            postgresql_where=text("confidence < 0.7")
+        ),
+        CheckConstraint("confidence >= 0 AND confidence <= 1", name="ck_fact_confidence"),
+    )
+
+
+# Materialized view (migration 014) holding the newest fact per scene, subject
+# and predicate. It is deliberately kept out of Base.metadata so autogenerate
+# does not mistake it for a table; refresh it with crud.refresh_latest_facts.
+latest_fact_per_scene = table(
+    "latest_fact_per_scene",
+    column("fact_id", BigInteger),
+    column("project_id", Integer),
+    column("scene_id", Integer),
+    column("subject_type", String),
+    column("subject_id", Integer),
+    column("predicate", String),
+    column("object_jsonb", JSONB),
+    column("object_hash", String),
+    column("created_at", DateTime(timezone=True)),
+)
+
 
 class Constraint(Base):
     """A rule/constraint that drafts must satisfy."""
-    __tablename__ = "constraint"
+    __tablename__ = "story_constraint"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, Identity(), primary_key=True)
     project_id = Column(Integer, ForeignKey("project.id", ondelete="CASCADE"), nullable=False)
     constraint_type = Column(String(50), nullable=False)  # e.g., "continuity", "style"
     rule_jsonb = Column(JSONB, nullable=False, default=dict)
-    severity = Column(String(20), nullable=False, default="error")  # error, warning, info
-    created_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+    severity = Column(
+        Enum("error", "warning", "info", name="constraint_severity"),
+        nullable=False, default="error"
+    )
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     project = relationship("Project", back_populates="constraints")
 
+    __table_args__ = (
+        Index("ix_constraint_project", "project_id", "id"),
+        # B-tree on the extracted scalar for ->> equality lookups
+        Index(
+            "ix_constraint_rule_type",
+            project_id, constraint_type, rule_jsonb["type"].astext
+        ),
+    )
+
 
 class EntityLink(Base):
     """
@@ -185,20 +252,28 @@ class EntityLink(Base):
     """
     __tablename__ = "entity_link"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigInteger, Identity(), primary_key=True)
     from_type = Column(String(50), nullable=False)
-    from_id = Column(Integer, nullable=False)
+    from_id = Column(BigInteger, nullable=False)
     to_type = Column(String(50), nullable=False)
-    to_id = Column(Integer, nullable=False)
+    to_id = Column(BigInteger, nullable=False)
     link_type = Column(String(50), nullable=False)  # e.g., "knows", "located_at", "owns"
     props_jsonb = Column(JSONB, nullable=False, default=dict)
     valid_from_scene_id = Column(Integer, ForeignKey("scene.id", ondelete="SET NULL"), nullable=True)
     valid_to_scene_id = Column(Integer, ForeignKey("scene.id", ondelete="SET NULL"), nullable=True)
-    created_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     __table_args__ = (
         Index("ix_entity_link_from", "from_type", "from_id"),
         Index("ix_entity_link_to", "to_type", "to_id"),
+        Index(
+            "ix_entity_link_valid_from", "valid_from_scene_id",
+            postgresql_where=text("valid_from_scene_id IS NOT NULL")
+        ),
+        Index(
+            "ix_entity_link_valid_to", "valid_to_scene_id",
+            postgresql_where=text("valid_to_scene_id IS NOT NULL")
+        ),
     )
 
 
@@ -206,47 +281,83 @@ class Iteration(Base):
     """A pipeline iteration for a scene."""
     __tablename__ = "iteration"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigInteger, Identity(), primary_key=True)
     scene_id = Column(Integer, ForeignKey("scene.id", ondelete="CASCADE"), nullable=False)
     iteration_no = Column(Integer, nullable=False)
-    status = Column(String(20), nullable=False, default="pending")  # pending, running, passed, failed
-    created_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
-    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now, nullable=False)
+    status = Column(
+        Enum("pending", "running", "passed", "failed", name="iteration_status"),
+        nullable=False, default="pending"
+    )
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     scene = relationship("Scene", back_populates="iterations")
-    check_runs = relationship("CheckRun", back_populates="iteration", cascade="all, delete-orphan")
-    tasks = relationship("Task", back_populates="iteration", cascade="all, delete-orphan")
+    # Always serialized with the iteration (IterationRead), so eager by default
+    check_runs = relationship(
+        "CheckRun", back_populates="iteration", cascade="all, delete-orphan", lazy="selectin"
+    )
+    tasks = relationship(
+        "Task", back_populates="iteration", cascade="all, delete-orphan", lazy="selectin"
+    )
+
+    __table_args__ = (
+        UniqueConstraint("scene_id", "iteration_no", name="uq_iteration_scene_no"),
+    )
 
 
 class CheckRun(Base):
     """A check run within an iteration."""
     __tablename__ = "check_run"
 
-    id = Column(Integer, primary_key=True, index=True)
-    iteration_id = Column(Integer, ForeignKey("iteration.id", ondelete="CASCADE"), nullable=False)
-    draft_id = Column(Integer, ForeignKey("draft.id", ondelete="CASCADE"), nullable=False)
-    check_type = Column(String(50), nullable=False)  # e.g., "continuity", "style"
+    id = Column(BigInteger, Identity(), primary_key=True)
+    iteration_id = Column(BigInteger, ForeignKey("iteration.id", ondelete="CASCADE"), nullable=False)
+    draft_id = Column(BigInteger, ForeignKey("draft.id", ondelete="CASCADE"), nullable=False)
+    check_type = Column(Enum("continuity", "style", name="check_type"), nullable=False)
     passed = Column(Boolean, nullable=False, default=False)
-    findings_jsonb = Column(JSONB, nullable=False, default=list)
-    created_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+    findings_jsonb = Column(JSONB, nullable=False, server_default=text("'[]'::jsonb"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     iteration = relationship("Iteration", back_populates="check_runs")
     draft = relationship("Draft", back_populates="check_runs")
 
+    __table_args__ = (
+        Index("ix_check_run_iteration", "iteration_id"),
+        Index("ix_check_run_draft", "draft_id"),
+    )
+
 
 class Task(Base):
     """A pipeline task within an iteration."""
     __tablename__ = "task"
 
-    id = Column(Integer, primary_key=True, index=True)
-    iteration_id = Column(Integer, ForeignKey("iteration.id", ondelete="CASCADE"), nullable=False)
-    task_type = Column(String(50), nullable=False)  # PLAN_SCENE, DRAFT_SCENE, etc.
-    status = Column(String(20), nullable=False, default="pending")  # pending, running, completed, failed
-    input_jsonb = Column(JSONB, nullable=False, default=dict)
+    id = Column(BigInteger, Identity(), primary_key=True)
+    iteration_id = Column(BigInteger, ForeignKey("iteration.id", ondelete="CASCADE"), nullable=False)
+    task_type = Column(
+        Enum(
+            "PLAN_SCENE", "DRAFT_SCENE", "EXTRACT_FACTS", "RUN_CHECKS", "REVISE", "COMMIT",
+            name="task_type"
+        ),
+        nullable=False
+    )
+    status = Column(
+        Enum("pending", "running", "completed", "failed", name="task_status"),
+        nullable=False, default="pending"
+    )
+    input_jsonb = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
     output_jsonb = Column(JSONB, nullable=False, default=dict)
     attempts = Column(Integer, nullable=False, default=0)
     locked_at = Column(DateTime(timezone=True), nullable=True)
-    created_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
-    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     iteration = relationship("Iteration", back_populates="tasks")
+
+    __table_args__ = (
+        # Loads an iteration's tasks and serves its cascade delete
+        Index("ix_task_iteration", "iteration_id", "id"),
+        # Covers only the dequeue frontier, so it stays small as tasks complete
+        Index(
+            "ix_task_pending", "iteration_id", "id",
+            postgresql_where=text("status = 'pending'")
+        ),
+    )
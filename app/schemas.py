@@ -2,8 +2,20 @@
 Pydantic v2 schemas for the System-2 Novel Engine.
 """
 from datetime import datetime
-from typing import Optional, Any
-from pydantic import BaseModel, ConfigDict
+from typing import Generic, Literal, Optional, Any, TypeVar
+from pydantic import BaseModel, ConfigDict, Field
+
+T = TypeVar("T")
+
+
+# ============================================================================
+# Pagination Schemas
+# ============================================================================
+
+class Page(BaseModel, Generic[T]):
+    """A keyset-paginated list; pass next_cursor back as after_id."""
+    items: list[T]
+    next_cursor: Optional[int] = None
 
 
 # ============================================================================
@@ -32,7 +44,7 @@ class ProjectRead(ProjectBase):
 # ============================================================================
 
 class StyleBibleBase(BaseModel):
-    content_jsonb: dict[str, Any] = {}
+    content_jsonb: dict[str, Any] = Field(default_factory=dict)
 
 
 class StyleBibleCreate(StyleBibleBase):
@@ -54,7 +66,7 @@ class StyleBibleRead(StyleBibleBase):
 
 class CharacterBase(BaseModel):
     name: str
-    data_jsonb: dict[str, Any] = {}
+    data_jsonb: dict[str, Any] = Field(default_factory=dict)
 
 
 class CharacterCreate(CharacterBase):
@@ -81,7 +93,7 @@ class CharacterRead(CharacterBase):
 
 class LocationBase(BaseModel):
     name: str
-    data_jsonb: dict[str, Any] = {}
+    data_jsonb: dict[str, Any] = Field(default_factory=dict)
 
 
 class LocationCreate(LocationBase):
@@ -107,10 +119,10 @@ class LocationRead(LocationBase):
 # ============================================================================
 
 class SceneBase(BaseModel):
-    chapter_no: int
-    scene_no: int
+    chapter_no: int = Field(ge=0)
+    scene_no: int = Field(ge=0)
     pov_character_id: Optional[int] = None
-    card_jsonb: dict[str, Any] = {}
+    card_jsonb: dict[str, Any] = Field(default_factory=dict)
 
 
 class SceneCreate(SceneBase):
@@ -118,8 +130,8 @@ class SceneCreate(SceneBase):
 
 
 class SceneUpdate(BaseModel):
-    chapter_no: Optional[int] = None
-    scene_no: Optional[int] = None
+    chapter_no: Optional[int] = Field(default=None, ge=0)
+    scene_no: Optional[int] = Field(default=None, ge=0)
     pov_character_id: Optional[int] = None
     card_jsonb: Optional[dict[str, Any]] = None
 
@@ -160,7 +172,7 @@ class DraftRead(DraftBase):
 
 class EventBase(BaseModel):
     story_time: Optional[str] = None
-    data_jsonb: dict[str, Any] = {}
+    data_jsonb: dict[str, Any] = Field(default_factory=dict)
 
 
 class EventCreate(EventBase):
@@ -184,8 +196,8 @@ class FactBase(BaseModel):
     subject_type: str
     subject_id: Optional[int] = None
     predicate: str
-    object_jsonb: dict[str, Any] = {}
-    confidence: float = 1.0
+    object_jsonb: dict[str, Any] = Field(default_factory=dict)
+    confidence: float = Field(default=1.0, ge=0, le=1)
 
 
 class FactCreate(FactBase):
@@ -206,8 +218,8 @@ class FactRead(FactBase):
 
 class ConstraintBase(BaseModel):
     constraint_type: str
-    rule_jsonb: dict[str, Any] = {}
-    severity: str = "error"
+    rule_jsonb: dict[str, Any] = Field(default_factory=dict)
+    severity: Literal["error", "warning", "info"] = "error"
 
 
 class ConstraintCreate(ConstraintBase):
@@ -232,7 +244,7 @@ class EntityLinkBase(BaseModel):
     to_type: str
     to_id: int
     link_type: str
-    props_jsonb: dict[str, Any] = {}
+    props_jsonb: dict[str, Any] = Field(default_factory=dict)
     valid_from_scene_id: Optional[int] = None
     valid_to_scene_id: Optional[int] = None
 
@@ -296,8 +308,8 @@ class IterationRead(BaseModel):
     status: str
     created_at: datetime
     updated_at: datetime
-    check_runs: list[CheckRunRead] = []
-    tasks: list[TaskRead] = []
+    check_runs: list[CheckRunRead] = Field(default_factory=list)
+    tasks: list[TaskRead] = Field(default_factory=list)
 
 
 # ============================================================================
@@ -309,6 +321,11 @@ class PipelineRunRequest(BaseModel):
     draft_id: Optional[int] = None
 
 
+class PipelineBatchRunRequest(BaseModel):
+    scene_ids: list[int] = Field(min_length=1)
+    max_attempts: int = 3
+
+
 class PipelineRunResponse(BaseModel):
     iteration_id: int
     status: str
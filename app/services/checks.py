@@ -2,9 +2,15 @@
 Continuity and style checks for drafts.
 Operates on extracted facts and constraints.
 """
+from functools import lru_cache
 from typing import Any
 from dataclasses import dataclass, field
 
+import ahocorasick
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+
 
 @dataclass
 class CheckResult:
@@ -14,10 +20,76 @@ class CheckResult:
     findings: list[dict[str, Any]] = field(default_factory=list)
 
 
-def run_continuity_check(
+PASSIVE_INDICATORS = ("was being", "were being", "had been", "has been")
+THIRD_PERSON_INDICATORS = (" he said", " she said", " they said")
+
+
+@lru_cache(maxsize=128)
+def _style_automaton(forbidden_words: tuple[str, ...]) -> ahocorasick.Automaton:
+    """
+    Build a matcher for every style pattern plus a project's forbidden words.
+
+    Each casefolded pattern maps to the (kind, original) pairs it stands for,
+    so one scan of the draft answers all pattern checks. Callers pass the
+    words sorted and deduplicated, so every style bible listing the same
+    words shares one cached automaton.
+    """
+    patterns: dict[str, list[tuple[str, str]]] = {}
+    for kind, words in (
+        ("passive", PASSIVE_INDICATORS),
+        ("pov", THIRD_PERSON_INDICATORS),
+        ("forbidden", forbidden_words),
+    ):
+        for word in words:
+            key = word.casefold()
+            if key:
+                patterns.setdefault(key, []).append((kind, word))
+
+    automaton = ahocorasick.Automaton()
+    for key, tags in patterns.items():
+        automaton.add_word(key, tuple(tags))
+    automaton.make_automaton()
+    return automaton
+
+
+@dataclass
+class TextStats:
+    """Draft measurements gathered in one scan and shared by the checks."""
+    word_count: int
+    adverb_count: int
+    passive_count: int
+    # (kind, pattern) pairs seen in the draft, for "pov" and "forbidden"
+    matched: set[tuple[str, str]] = field(default_factory=set)
+
+
+def compute_text_stats(draft_text: str, forbidden_words: tuple[str, ...] = ()) -> TextStats:
+    """
+    Measure a draft: one split for words and adverbs (longer than four
+    characters, ending in "ly"), one automaton pass over its casefolded
+    text for every phrase pattern.
+    """
+    words = draft_text.split()
+    stats = TextStats(
+        word_count=len(words),
+        adverb_count=sum(1 for w in words if len(w) > 4 and w[-2:].lower() == "ly"),
+        passive_count=0
+    )
+    automaton = _style_automaton(tuple(sorted(set(forbidden_words))))
+    for _, tags in automaton.iter(draft_text.casefold()):
+        for kind, word in tags:
+            if kind == "passive":
+                stats.passive_count += 1
+            else:
+                stats.matched.add((kind, word))
+    return stats
+
+
+async def run_continuity_check(
+    db: AsyncSession,
+    draft_id: int,
     facts: list[dict[str, Any]],
     constraints: list[dict[str, Any]],
-    previous_facts: list[dict[str, Any]] = None
+    scene_id: int = None
 ) -> CheckResult:
     """
     Run continuity checks on extracted facts.
@@ -28,65 +100,56 @@ def run_continuity_check(
     - Character behavior consistency
     
     Args:
+        db: Database session.
+        draft_id: The draft whose stored facts are checked.
         facts: Facts extracted from the current draft.
-        constraints: Project constraints to check against.
-        previous_facts: Facts from previous scenes/drafts.
+        constraints: The project's "character_must_appear" continuity
+            constraints, already filtered by the caller's query.
+        scene_id: The draft's scene; when given, facts are compared with
+            those established by earlier scenes of the project.
         
     Returns:
         CheckResult with pass/fail status and findings.
     """
     findings = []
-    previous_facts = previous_facts or []
     
-    # Check for low-confidence facts
-    for fact in facts:
-        confidence = fact.get("confidence", 1.0)
-        if confidence < 0.7:
+    # Check for low-confidence facts (partial index over the stored facts)
+    for fact in await crud.get_low_confidence_facts(db, draft_id):
+        findings.append({
+            "severity": "warning",
+            "issue": f"Low confidence fact ({fact['confidence']:.2f}): {fact['predicate']}",
+            "fact_type": fact["fact_type"],
+            "suggestion": "Consider clarifying or removing ambiguous information"
+        })
+    
+    # Check required character presence
+    for constraint in constraints:
+        char_id = constraint.get("rule_jsonb", {}).get("character_id")
+        char_facts = [
+            f for f in facts 
+            if f.get("subject_type") == "character" 
+            and f.get("subject_id") == char_id
+        ]
+        if not char_facts:
             findings.append({
-                "severity": "warning",
-                "issue": f"Low confidence fact ({confidence:.2f}): {fact.get('predicate')}",
-                "fact_type": fact.get("fact_type"),
-                "suggestion": "Consider clarifying or removing ambiguous information"
+                "severity": constraint.get("severity", "error"),
+                "issue": f"Required character {char_id} does not appear in scene",
+                "constraint_id": constraint.get("id"),
+                "suggestion": "Add character to the scene"
             })
     
-    # Check against constraints
-    for constraint in constraints:
-        if constraint.get("constraint_type") == "continuity":
-            rule = constraint.get("rule_jsonb", {})
-            
-            # Example: Check for required character presence
-            if rule.get("type") == "character_must_appear":
-                char_id = rule.get("character_id")
-                char_facts = [
-                    f for f in facts 
-                    if f.get("subject_type") == "character" 
-                    and f.get("subject_id") == char_id
-                ]
-                if not char_facts:
-                    findings.append({
-                        "severity": constraint.get("severity", "error"),
-                        "issue": f"Required character {char_id} does not appear in scene",
-                        "constraint_id": constraint.get("id"),
-                        "suggestion": "Add character to the scene"
-                    })
-    
-    # Check for contradictions with previous facts
-    for fact in facts:
-        for prev_fact in previous_facts:
-            if (
-                fact.get("subject_type") == prev_fact.get("subject_type")
-                and fact.get("subject_id") == prev_fact.get("subject_id")
-                and fact.get("predicate") == prev_fact.get("predicate")
-            ):
-                # Same subject and predicate - check for contradiction
-                if fact.get("object_jsonb") != prev_fact.get("object_jsonb"):
-                    findings.append({
-                        "severity": "error",
-                        "issue": f"Potential contradiction: {fact.get('predicate')} differs from previous fact",
-                        "current": fact.get("object_jsonb"),
-                        "previous": prev_fact.get("object_jsonb"),
-                        "suggestion": "Reconcile the contradiction or justify the change"
-                    })
+    # Check for contradictions with previous scenes (latest_fact_per_scene)
+    contradictions = []
+    if scene_id is not None:
+        contradictions = await crud.get_contradicting_facts(db, draft_id, scene_id)
+    for row in contradictions:
+        findings.append({
+            "severity": "error",
+            "issue": f"Potential contradiction: {row['predicate']} differs from previous fact",
+            "current": row["current_object"],
+            "previous": row["previous_object"],
+            "suggestion": "Reconcile the contradiction or justify the change"
+        })
     
     # Determine pass/fail based on error-level findings
     has_errors = any(f.get("severity") == "error" for f in findings)
@@ -100,7 +163,8 @@ def run_continuity_check(
 
 def run_style_check(
     draft_text: str,
-    style_bible: dict[str, Any] = None
+    style_bible: dict[str, Any] = None,
+    stats: TextStats = None
 ) -> CheckResult:
     """
     Run style checks on draft text.
@@ -114,14 +178,19 @@ def run_style_check(
     Args:
         draft_text: The draft text to check.
         style_bible: The project's style guide.
+        stats: Precomputed measurements of draft_text for this style
+            bible's forbidden words; computed here if omitted.
         
     Returns:
         CheckResult with pass/fail status and findings.
     """
     findings = []
     style_bible = style_bible or {}
+    forbidden = style_bible.get("forbidden_words", [])
+    if stats is None:
+        stats = compute_text_stats(draft_text, tuple(forbidden))
     
-    word_count = len(draft_text.split())
+    word_count = stats.word_count
     
     # Check minimum word count
     min_words = style_bible.get("min_word_count", 100)
@@ -141,12 +210,8 @@ def run_style_check(
             "suggestion": f"Consider splitting the scene or trimming to {max_words} words"
         })
     
-    # Check for common style issues (simplified rules)
-    lower_text = draft_text.lower()
-    
     # Check for passive voice indicators (simplified)
-    passive_indicators = ["was being", "were being", "had been", "has been"]
-    passive_count = sum(lower_text.count(indicator) for indicator in passive_indicators)
+    passive_count = stats.passive_count
     if passive_count > 5:
         findings.append({
             "severity": "info",
@@ -155,20 +220,18 @@ def run_style_check(
         })
     
     # Check for adverb overuse (words ending in -ly)
-    words = draft_text.split()
-    adverbs = [w for w in words if w.lower().endswith("ly") and len(w) > 4]
-    adverb_ratio = len(adverbs) / max(len(words), 1)
+    adverb_count = stats.adverb_count
+    adverb_ratio = adverb_count / max(word_count, 1)
     if adverb_ratio > 0.03:  # More than 3% adverbs
         findings.append({
             "severity": "info",
-            "issue": f"Consider reducing adverb usage ({len(adverbs)} adverbs in {len(words)} words)",
+            "issue": f"Consider reducing adverb usage ({adverb_count} adverbs in {word_count} words)",
             "suggestion": "Replace adverbs with stronger verbs where possible"
         })
     
     # Check for forbidden words/phrases
-    forbidden = style_bible.get("forbidden_words", [])
     for word in forbidden:
-        if word.lower() in lower_text:
+        if ("forbidden", word) in stats.matched:
             findings.append({
                 "severity": "error",
                 "issue": f"Forbidden word/phrase found: '{word}'",
@@ -179,9 +242,8 @@ def run_style_check(
     pov = style_bible.get("pov", "third")
     if pov == "first":
         # Check for accidental third-person in first-person narrative
-        third_person_indicators = [" he said", " she said", " they said"]
-        for indicator in third_person_indicators:
-            if indicator in lower_text:
+        for indicator in THIRD_PERSON_INDICATORS:
+            if ("pov", indicator) in stats.matched:
                 findings.append({
                     "severity": "warning",
                     "issue": f"Possible POV break: '{indicator.strip()}' in first-person narrative",
@@ -198,27 +260,33 @@ def run_style_check(
     )
 
 
-def run_all_checks(
+async def run_all_checks(
+    db: AsyncSession,
+    draft_id: int,
     draft_text: str,
     facts: list[dict[str, Any]],
     constraints: list[dict[str, Any]],
     style_bible: dict[str, Any] = None,
-    previous_facts: list[dict[str, Any]] = None
+    scene_id: int = None
 ) -> list[CheckResult]:
     """
     Run all checks on a draft.
     
     Args:
+        db: Database session.
+        draft_id: ID of the draft being checked.
         draft_text: The draft text.
         facts: Facts extracted from the draft.
-        constraints: Project constraints.
+        constraints: Project "character_must_appear" continuity constraints.
         style_bible: Project style guide.
-        previous_facts: Facts from previous scenes.
+        scene_id: Scene to check against earlier scenes, if any.
         
     Returns:
         List of CheckResult objects.
     """
+    style_bible = style_bible or {}
+    stats = compute_text_stats(draft_text, tuple(style_bible.get("forbidden_words", [])))
     return [
-        run_continuity_check(facts, constraints, previous_facts),
-        run_style_check(draft_text, style_bible)
+        await run_continuity_check(db, draft_id, facts, constraints, scene_id),
+        run_style_check(draft_text, style_bible, stats)
     ]
@@ -2,8 +2,30 @@
 Stub LLM extraction functions.
 Returns deterministic dummy output for local testing.
 """
-from typing import Any
+from collections.abc import Mapping
+from typing import Any, Optional
 import hashlib
+import random
+
+
+# Every stub plan has the same beats; they're shared between plans and
+# must not be mutated
+_PLAN_BEATS = (
+    {"order": 1, "description": "Opening hook - establish setting and tension"},
+    {"order": 2, "description": "Character introduction and dialogue"},
+    {"order": 3, "description": "Rising action - conflict emerges"},
+    {"order": 4, "description": "Climactic moment"},
+    {"order": 5, "description": "Resolution and transition"},
+)
+
+
+# Width of fact.embedding (migration 002)
+EMBEDDING_DIMENSIONS = 1536
+
+
+def text_digest(draft_text: str) -> str:
+    """Short deterministic digest of a draft, shared by the stubs below."""
+    return hashlib.blake2b(draft_text.encode(), digest_size=4).hexdigest()
 
 
 def extract_facts(draft_text: str) -> list[dict[str, Any]]:
@@ -11,7 +33,8 @@ def extract_facts(draft_text: str) -> list[dict[str, Any]]:
     Extract facts from a draft text.
     
     In production, this would call an LLM to extract structured facts.
-    For now, returns deterministic dummy facts based on the text.
+    For now, returns the same dummy facts for every draft, so consecutive
+    scenes never contradict each other in the continuity check.
     
     Args:
         draft_text: The text of the draft to extract facts from.
@@ -19,16 +42,13 @@ def extract_facts(draft_text: str) -> list[dict[str, Any]]:
     Returns:
         A list of fact dictionaries.
     """
-    # Generate deterministic "facts" based on text hash
-    text_hash = hashlib.md5(draft_text.encode()).hexdigest()[:8]
-    
     facts = [
         {
             "fact_type": "character_trait",
             "subject_type": "character",
             "subject_id": 1,
             "predicate": "appears_in_scene",
-            "object_jsonb": {"action": "speaks", "hash": text_hash},
+            "object_jsonb": {"action": "speaks"},
             "confidence": 0.95
         },
         {
@@ -36,7 +56,7 @@ def extract_facts(draft_text: str) -> list[dict[str, Any]]:
             "subject_type": "location",
             "subject_id": None,
             "predicate": "setting",
-            "object_jsonb": {"description": "interior", "hash": text_hash},
+            "object_jsonb": {"description": "interior"},
             "confidence": 0.85
         },
         {
@@ -44,7 +64,7 @@ def extract_facts(draft_text: str) -> list[dict[str, Any]]:
             "subject_type": "scene",
             "subject_id": None,
             "predicate": "contains_event",
-            "object_jsonb": {"event_type": "dialogue", "hash": text_hash},
+            "object_jsonb": {"event_type": "dialogue"},
             "confidence": 0.90
         }
     ]
@@ -52,7 +72,7 @@ def extract_facts(draft_text: str) -> list[dict[str, Any]]:
     return facts
 
 
-def summarize_scene(draft_text: str) -> str:
+def summarize_scene(draft_text: str, *, digest: Optional[str] = None) -> str:
     """
     Generate a summary of the scene draft.
     
@@ -61,12 +81,13 @@ def summarize_scene(draft_text: str) -> str:
     
     Args:
         draft_text: The text of the draft to summarize.
+        digest: text_digest(draft_text), if the caller already has it.
         
     Returns:
         A summary string.
     """
     word_count = len(draft_text.split())
-    text_hash = hashlib.md5(draft_text.encode()).hexdigest()[:8]
+    text_hash = digest or text_digest(draft_text)
     
     return f"Scene summary ({word_count} words): A scene involving character interactions and plot development. [Hash: {text_hash}]"
 
@@ -82,16 +103,10 @@ def generate_scene_plan(scene_card: dict[str, Any]) -> dict[str, Any]:
         scene_card: The scene's card_jsonb with metadata.
         
     Returns:
-        A plan dictionary.
+        A plan dictionary. Its "beats" are shared and must not be mutated.
     """
     return {
-        "beats": [
-            {"order": 1, "description": "Opening hook - establish setting and tension"},
-            {"order": 2, "description": "Character introduction and dialogue"},
-            {"order": 3, "description": "Rising action - conflict emerges"},
-            {"order": 4, "description": "Climactic moment"},
-            {"order": 5, "description": "Resolution and transition"}
-        ],
+        "beats": _PLAN_BEATS,
         "tone": scene_card.get("tone", "dramatic"),
         "pacing": "medium",
         "word_target": 1500
@@ -150,19 +165,41 @@ def revise_draft(
     """
     finding_count = len(check_findings)
     
-    revision_note = f"""
-
-[REVISION NOTE]
-Addressed {finding_count} finding(s) from continuity and style checks.
-Revisions applied:
-"""
-    
-    for i, finding in enumerate(check_findings, 1):
-        issue = finding.get("issue", "unspecified issue")
-        revision_note += f"  {i}. Corrected: {issue}\n"
-    
-    revision_note += "[END REVISION NOTE]"
+    lines = [
+        "",
+        "",
+        "[REVISION NOTE]",
+        f"Addressed {finding_count} finding(s) from continuity and style checks.",
+        "Revisions applied:",
+    ]
+    lines.extend(
+        f"  {i}. Corrected: {finding.get('issue', 'unspecified issue')}"
+        for i, finding in enumerate(check_findings, 1)
+    )
+    lines.append("[END REVISION NOTE]")
     
     # In reality, we'd send to LLM for proper revision
     # For now, append note to show revision occurred
-    return current_draft + revision_note
+    return current_draft + "\n".join(lines)
+
+
+def embed_facts(facts: list[Mapping[str, Any]]) -> list[list[float]]:
+    """
+    Embed facts for semantic search.
+    
+    In production, this would call an embedding model.
+    For now, returns a deterministic pseudo-random vector per fact, seeded
+    from its subject, predicate and object.
+    
+    Args:
+        facts: Fact rows or dictionaries.
+        
+    Returns:
+        One EMBEDDING_DIMENSIONS-long vector per fact, in order.
+    """
+    embeddings = []
+    for fact in facts:
+        seed = f"{fact['subject_type']}:{fact['subject_id']}:{fact['predicate']}:{fact['object_jsonb']}"
+        rng = random.Random(seed)
+        embeddings.append([rng.uniform(-1.0, 1.0) for _ in range(EMBEDDING_DIMENSIONS)])
+    return embeddings
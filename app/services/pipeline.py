@@ -8,10 +8,11 @@ State transitions:
 If max_attempts reached without passing checks, transitions to FAILED.
 """
 import os
-from datetime import datetime, timezone
+from datetime import timedelta
 from enum import Enum
-from typing import Optional, Any
-from sqlalchemy.orm import Session
+from functools import lru_cache
+from typing import Optional, Any, Callable, Union
+from sqlalchemy.ext.asyncio import AsyncSession
 from redis import Redis
 from rq import Queue
 
@@ -37,30 +38,129 @@ class IterationStatus(str, Enum):
     FAILED = "failed"
 
 
-# State machine transitions
-NEXT_TASK = {
+Transition = Union[TaskType, IterationStatus]
+
+
+def _after_run_checks(input_data: dict[str, Any], output_data: dict[str, Any]) -> Transition:
+    """COMMIT if all checks passed, REVISE while attempts remain, else FAILED."""
+    if output_data.get("all_passed", False):
+        return TaskType.COMMIT
+    if input_data.get("current_attempt", 0) >= input_data.get("max_attempts", 3):
+        return IterationStatus.FAILED
+    return TaskType.REVISE
+
+
+# State machine transitions: the next task type, the iteration's final
+# status, or a function of the task's input and output that picks one
+TRANSITIONS: dict[
+    TaskType, Union[Transition, Callable[[dict[str, Any], dict[str, Any]], Transition]]
+] = {
     TaskType.PLAN_SCENE: TaskType.DRAFT_SCENE,
     TaskType.DRAFT_SCENE: TaskType.EXTRACT_FACTS,
     TaskType.EXTRACT_FACTS: TaskType.RUN_CHECKS,
-    # RUN_CHECKS branches: COMMIT if passed, REVISE if failed
+    TaskType.RUN_CHECKS: _after_run_checks,
     TaskType.REVISE: TaskType.EXTRACT_FACTS,
-    # COMMIT is terminal
+    TaskType.COMMIT: IterationStatus.PASSED,
 }
 
 
+# Built once per process and shared: redis-py clients are thread-safe and
+# their connection pool resets itself in a forked work horse.
+@lru_cache(maxsize=1)
 def get_redis_connection() -> Redis:
     """Get Redis connection from environment."""
     redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     return Redis.from_url(redis_url)
 
 
+@lru_cache(maxsize=1)
 def get_task_queue() -> Queue:
     """Get RQ task queue."""
     return Queue("novel-engine", connection=get_redis_connection())
 
 
-def start_iteration(
-    db: Session,
+# Job function and timeout (seconds) for every pipeline task
+PROCESS_TASK = "app.services.pipeline.process_task"
+TASK_JOB_TIMEOUT = 600
+
+
+def enqueue_tasks(task_ids: list[int]) -> None:
+    """
+    Enqueue a process_task job per task.
+
+    All RQ bookkeeping commands for the batch go out in a single Redis
+    pipeline, so the cost is one round trip however many tasks there are.
+    """
+    if not task_ids:
+        return
+    queue = get_task_queue()
+    with queue.connection.pipeline(transaction=False) as pipe:
+        queue.enqueue_many(
+            [
+                Queue.prepare_data(PROCESS_TASK, args=(task_id,), timeout=TASK_JOB_TIMEOUT)
+                for task_id in task_ids
+            ],
+            pipeline=pipe
+        )
+        pipe.execute()
+
+
+# Job function for rebuilding the latest_fact_per_scene view, and how long
+# commits are collected before one rebuild covers them all
+REFRESH_LATEST_FACTS = "app.services.pipeline.refresh_latest_facts"
+LATEST_FACTS_REFRESH_DELAY = timedelta(seconds=60)
+LATEST_FACTS_REFRESH_KEY = "novel-engine:latest-facts-refresh"
+
+
+def schedule_latest_facts_refresh() -> None:
+    """
+    Schedule a rebuild of latest_fact_per_scene unless one is already due.
+
+    The refresh scans every fact in every project, so it is not run per
+    COMMIT: the first commit of a window schedules it for the window's end
+    (on the worker's scheduler) and later commits in the window ride along.
+    """
+    redis = get_redis_connection()
+    delay = int(LATEST_FACTS_REFRESH_DELAY.total_seconds())
+    if redis.set(LATEST_FACTS_REFRESH_KEY, 1, nx=True, ex=delay):
+        get_task_queue().enqueue_in(
+            LATEST_FACTS_REFRESH_DELAY, REFRESH_LATEST_FACTS, job_timeout=TASK_JOB_TIMEOUT
+        )
+
+
+async def refresh_latest_facts() -> None:
+    """RQ job: rebuild latest_fact_per_scene."""
+    from app.db import SessionLocal, engine
+
+    try:
+        async with SessionLocal() as db:
+            await crud.refresh_latest_facts(db)
+    finally:
+        await engine.dispose()
+
+
+def _initial_task(
+    scene_id: int, max_attempts: int, draft_id: Optional[int] = None
+) -> tuple[TaskType, dict[str, Any]]:
+    """
+    First task of an iteration and its input.
+
+    With a draft_id the pipeline starts at EXTRACT_FACTS (Analysis Mode),
+    otherwise at PLAN_SCENE (Generation Mode).
+    """
+    initial_input = {
+        "scene_id": scene_id,
+        "max_attempts": max_attempts,
+        "current_attempt": 0
+    }
+    if draft_id:
+        initial_input["draft_id"] = draft_id
+        return TaskType.EXTRACT_FACTS, initial_input
+    return TaskType.PLAN_SCENE, initial_input
+
+
+async def start_iteration(
+    db: AsyncSession,
     scene_id: int,
     max_attempts: int = 3,
     draft_id: Optional[int] = None
@@ -82,58 +182,90 @@ def start_iteration(
         The created Iteration.
     """
     # Verify scene exists
-    scene = crud.get_scene(db, scene_id)
+    scene = await crud.get_scene(db, scene_id)
     if not scene:
         raise ValueError(f"Scene {scene_id} not found")
     
     # Create iteration
-    iteration = crud.create_iteration(db, scene_id)
-    
-    # Determine start task
-    if draft_id:
-        task_type = TaskType.EXTRACT_FACTS.value
-        initial_input = {
-            "scene_id": scene_id,
-            "draft_id": draft_id,
-            "max_attempts": max_attempts,
-            "current_attempt": 0
-        }
-    else:
-        task_type = TaskType.PLAN_SCENE.value
-        initial_input = {
-            "scene_id": scene_id,
-            "max_attempts": max_attempts,
-            "current_attempt": 0
-        }
+    iteration = await crud.create_iteration(db, scene_id)
     
     # Create first task
-    first_task = crud.create_task(
+    task_type, initial_input = _initial_task(scene_id, max_attempts, draft_id)
+    first_task = await crud.create_task(
         db,
         iteration_id=iteration.id,
-        task_type=task_type,
+        task_type=task_type.value,
         input_jsonb=initial_input
     )
     
     # Update iteration status
-    crud.update_iteration_status(db, iteration.id, IterationStatus.RUNNING.value)
+    await crud.update_iteration_status(db, iteration.id, IterationStatus.RUNNING.value)
     
     # Enqueue task for processing
-    queue = get_task_queue()
-    queue.enqueue(
-        "app.services.pipeline.process_task",
-        first_task.id,
-        job_timeout="10m"
-    )
+    enqueue_tasks([first_task.id])
     
     return iteration
 
 
-def process_task(task_id: int) -> dict[str, Any]:
+async def start_iterations(
+    db: AsyncSession,
+    scene_ids: list[int],
+    max_attempts: int = 3
+) -> list[models.Iteration]:
+    """
+    Start a Generation Mode iteration for each of several scenes.
+    
+    Iterations are numbered per scene as in start_iteration and inserted
+    in one statement, as are their first tasks; the iterations are marked
+    running in one UPDATE, all three committed together, and all jobs
+    enqueued in one Redis round trip.
+    
+    Args:
+        db: Database session.
+        scene_ids: IDs of the scenes to process.
+        max_attempts: Maximum revision attempts before failing.
+        
+    Returns:
+        The created Iterations, in scene_ids order.
+    """
+    existing = await crud.get_existing_scene_ids(db, scene_ids)
+    missing = [scene_id for scene_id in scene_ids if scene_id not in existing]
+    if missing:
+        raise ValueError(f"Scenes not found: {missing}")
+    
+    # Iterations and first tasks are committed with the status UPDATE
+    iterations = await crud.create_iterations(db, scene_ids, commit=False)
+    
+    first_tasks = []
+    for iteration in iterations:
+        task_type, initial_input = _initial_task(iteration.scene_id, max_attempts)
+        first_tasks.append({
+            "iteration_id": iteration.id,
+            "task_type": task_type.value,
+            "input_jsonb": initial_input
+        })
+    task_ids = await crud.create_tasks(db, first_tasks, commit=False)
+    
+    await crud.update_iterations_status(
+        db, [iteration.id for iteration in iterations], IterationStatus.RUNNING.value
+    )
+    
+    enqueue_tasks(task_ids)
+    
+    return iterations
+
+
+async def process_task(task_id: int) -> dict[str, Any]:
     """
     Process a pipeline task.
     
     This is the main RQ job handler. It executes the task
-    and advances the state machine.
+    and advances the state machine. RQ runs the returned
+    coroutine to completion on its own event loop.
+    
+    While the queue is empty, cheap follow-up tasks (INLINE_TASKS)
+    run in this same job, up to MAX_INLINE_TASKS of them, instead of
+    a Redis round trip each; the first task not run inline is enqueued.
     
     Args:
         task_id: ID of the task to process.
@@ -141,20 +273,71 @@ def process_task(task_id: int) -> dict[str, Any]:
     Returns:
         Task output dictionary.
     """
-    from app.db import SessionLocal
+    from app.db import SessionLocal, engine
     
     db = SessionLocal()
     try:
-        task = crud.get_task(db, task_id)
-        if not task:
-            raise ValueError(f"Task {task_id} not found")
+        output, next_task = await _run_task(db, task_id)
+        
+        inlined = 0
+        while next_task is not None and _should_inline(next_task, inlined):
+            inlined += 1
+            _, next_task = await _run_task(db, next_task.id)
         
-        # Lock the task
-        task.locked_at = datetime.now(timezone.utc)
-        task.status = "running"
-        task.attempts += 1
-        db.commit()
+        # Enqueue only once the next task's row is committed
+        if next_task is not None:
+            enqueue_tasks([next_task.id])
         
+        return output
+            
+    finally:
+        await db.close()
+        # RQ runs each coroutine job on a fresh event loop, and asyncpg
+        # connections can't outlive the loop that opened them.
+        await engine.dispose()
+
+
+# Task types whose handlers are cheap enough (the deterministic stubs) to
+# run inline in the job that created them.
+INLINE_TASKS = frozenset({
+    TaskType.PLAN_SCENE,
+    TaskType.DRAFT_SCENE,
+    TaskType.EXTRACT_FACTS,
+    TaskType.REVISE,
+    TaskType.COMMIT,
+})
+MAX_INLINE_TASKS = 8
+
+
+def _should_inline(task: models.Task, inlined: int) -> bool:
+    """Whether to run task in the current job rather than enqueue it."""
+    return (
+        inlined < MAX_INLINE_TASKS
+        # TaskType members hash as their str values, so no enum lookup
+        and task.task_type in INLINE_TASKS
+        and not get_task_queue().count
+    )
+
+
+async def _run_task(
+    db: AsyncSession, task_id: int
+) -> tuple[dict[str, Any], Optional[models.Task]]:
+    """
+    Claim and execute one task, then commit the handler's writes and the
+    task's completion together with the state machine's transition.
+    Returns the task's output and the next task, if one was created; the
+    next task is not enqueued. A task that can't be claimed is skipped
+    with {"skipped": True}.
+    """
+    # The claim commits on its own, so no row lock is held while the
+    # handler runs
+    task = await crud.claim_task(db, task_id)
+    if task is None:
+        # Missing, or no longer pending (a duplicate job got here first)
+        return {"skipped": True}, None
+    attempts = task.attempts
+    
+    try:
         # Execute based on task type
         task_type = TaskType(task.task_type)
         handler = TASK_HANDLERS.get(task_type)
@@ -162,68 +345,56 @@ def process_task(task_id: int) -> dict[str, Any]:
         if not handler:
             raise ValueError(f"Unknown task type: {task_type}")
         
-        try:
-            output = handler(db, task)
-            task.output_jsonb = output
-            task.status = "completed"
-            db.commit()
-            
-            # Advance state machine
-            advance_state_machine(db, task)
-            
-            return output
-            
-        except Exception as e:
-            task.status = "failed"
-            task.output_jsonb = {"error": str(e)}
-            db.commit()
-            raise
-            
-    finally:
-        db.close()
+        output = await handler(db, task)
+        task.output_jsonb = output
+        task.status = "completed"
+        
+        # Completion, the next task and any iteration status change
+        # are committed together
+        next_task = await advance_state_machine(db, task, task_type)
+        await db.commit()
+        
+    except Exception as e:
+        await db.rollback()
+        await crud.update_task(
+            db, task_id, status="failed", output_jsonb={"error": str(e)}, attempts=attempts
+        )
+        raise
+    
+    return output, next_task
 
 
-def advance_state_machine(db: Session, completed_task: models.Task) -> None:
+async def advance_state_machine(
+    db: AsyncSession, completed_task: models.Task, task_type: TaskType
+) -> Optional[models.Task]:
     """
     Advance the state machine after a task completes.
     
     Determines the next task based on current state and
-    creates/enqueues it.
+    creates it, or settles the iteration's status. Nothing is
+    committed or enqueued; the caller does both.
     
     Args:
         db: Database session.
         completed_task: The task that just completed.
+        task_type: completed_task's type, already resolved by the caller.
+        
+    Returns:
+        The created next task, or None if the iteration ended.
     """
-    task_type = TaskType(completed_task.task_type)
-    iteration = crud.get_iteration(db, completed_task.iteration_id)
+    iteration_id = completed_task.iteration_id
     input_data = completed_task.input_jsonb
     output_data = completed_task.output_jsonb
     
-    # Handle branching for RUN_CHECKS
-    if task_type == TaskType.RUN_CHECKS:
-        all_passed = output_data.get("all_passed", False)
-        current_attempt = input_data.get("current_attempt", 0)
-        max_attempts = input_data.get("max_attempts", 3)
-        
-        if all_passed:
-            # All checks passed - go to COMMIT
-            next_task_type = TaskType.COMMIT
-        elif current_attempt >= max_attempts:
-            # Max attempts reached - fail the iteration
-            crud.update_iteration_status(db, iteration.id, IterationStatus.FAILED.value)
-            return
-        else:
-            # Checks failed - go to REVISE
-            next_task_type = TaskType.REVISE
-    elif task_type == TaskType.COMMIT:
-        # COMMIT is terminal - mark iteration as passed
-        crud.update_iteration_status(db, iteration.id, IterationStatus.PASSED.value)
-        return
-    else:
-        # Standard transition
-        next_task_type = NEXT_TASK.get(task_type)
-        if not next_task_type:
-            return
+    transition = TRANSITIONS[task_type]
+    if callable(transition):
+        transition = transition(input_data, output_data)
+    
+    # Terminal state - settle the iteration
+    if isinstance(transition, IterationStatus):
+        await crud.update_iteration_status(db, iteration_id, transition.value, commit=False)
+        return None
+    next_task_type = transition
     
     # Build input for next task
     next_input = {
@@ -246,19 +417,13 @@ def advance_state_machine(db: Session, completed_task: models.Task) -> None:
     if next_task_type == TaskType.REVISE:
         next_input["current_attempt"] = next_input.get("current_attempt", 0) + 1
     
-    # Create and enqueue next task
-    next_task = crud.create_task(
+    # Create next task
+    return await crud.create_task(
         db,
-        iteration_id=iteration.id,
+        iteration_id=iteration_id,
         task_type=next_task_type.value,
-        input_jsonb=next_input
-    )
-    
-    queue = get_task_queue()
-    queue.enqueue(
-        "app.services.pipeline.process_task",
-        next_task.id,
-        job_timeout="10m"
+        input_jsonb=next_input,
+        commit=False
     )
 
 
@@ -266,10 +431,10 @@ def advance_state_machine(db: Session, completed_task: models.Task) -> None:
 # Task Handlers
 # ============================================================================
 
-def handle_plan_scene(db: Session, task: models.Task) -> dict[str, Any]:
+async def handle_plan_scene(db: AsyncSession, task: models.Task) -> dict[str, Any]:
     """Handle PLAN_SCENE task."""
     scene_id = task.input_jsonb.get("scene_id")
-    scene = crud.get_scene(db, scene_id)
+    scene = await crud.get_scene(db, scene_id)
     
     if not scene:
         raise ValueError(f"Scene {scene_id} not found")
@@ -283,11 +448,11 @@ def handle_plan_scene(db: Session, task: models.Task) -> dict[str, Any]:
     }
 
 
-def handle_draft_scene(db: Session, task: models.Task) -> dict[str, Any]:
+async def handle_draft_scene(db: AsyncSession, task: models.Task) -> dict[str, Any]:
     """Handle DRAFT_SCENE task."""
     scene_id = task.input_jsonb.get("scene_id")
     plan = task.input_jsonb.get("plan", {})
-    scene = crud.get_scene(db, scene_id)
+    scene = await crud.get_scene(db, scene_id)
     
     if not scene:
         raise ValueError(f"Scene {scene_id} not found")
@@ -296,10 +461,11 @@ def handle_draft_scene(db: Session, task: models.Task) -> dict[str, Any]:
     draft_text = extraction.generate_draft(scene.card_jsonb, plan)
     
     # Create draft record (append-only)
-    draft = crud.create_draft(
+    draft = await crud.create_draft(
         db,
         scene_id=scene_id,
-        draft=schemas.DraftCreate(text=draft_text)
+        draft=schemas.DraftCreate(text=draft_text),
+        commit=False
     )
     
     return {
@@ -309,10 +475,10 @@ def handle_draft_scene(db: Session, task: models.Task) -> dict[str, Any]:
     }
 
 
-def handle_extract_facts(db: Session, task: models.Task) -> dict[str, Any]:
+async def handle_extract_facts(db: AsyncSession, task: models.Task) -> dict[str, Any]:
     """Handle EXTRACT_FACTS task."""
     draft_id = task.input_jsonb.get("draft_id")
-    draft = crud.get_draft(db, draft_id)
+    draft = await crud.get_draft(db, draft_id)
     
     if not draft:
         raise ValueError(f"Draft {draft_id} not found")
@@ -321,80 +487,75 @@ def handle_extract_facts(db: Session, task: models.Task) -> dict[str, Any]:
     fact_dicts = extraction.extract_facts(draft.text)
     
     # Store facts in database
-    stored_facts = []
-    for fact_dict in fact_dicts:
-        fact = crud.create_fact(
-            db,
-            source_draft_id=draft_id,
-            fact=schemas.FactBase(**fact_dict)
-        )
-        stored_facts.append({
-            "id": fact.id,
-            **fact_dict
-        })
+    fact_ids = await crud.create_facts(
+        db,
+        source_draft_id=draft_id,
+        facts=[schemas.FactBase(**fact_dict) for fact_dict in fact_dicts],
+        commit=False
+    )
+    # The extracted dicts are ours; tag them with their IDs in place
+    for fact_dict, fact_id in zip(fact_dicts, fact_ids):
+        fact_dict["id"] = fact_id
     
     # Generate summary
     summary = extraction.summarize_scene(draft.text)
     
     return {
         "draft_id": draft_id,
-        "facts": stored_facts,
+        "facts": fact_dicts,
         "summary": summary
     }
 
 
-def handle_run_checks(db: Session, task: models.Task) -> dict[str, Any]:
+async def handle_run_checks(db: AsyncSession, task: models.Task) -> dict[str, Any]:
     """Handle RUN_CHECKS task."""
     scene_id = task.input_jsonb.get("scene_id")
     draft_id = task.input_jsonb.get("draft_id")
     facts = task.input_jsonb.get("facts", [])
     
-    draft = crud.get_draft(db, draft_id)
-    scene = crud.get_scene(db, scene_id)
+    draft = await crud.get_draft(db, draft_id)
+    # Scene, latest style bible and constraints in one query; only
+    # character-presence rules are checked, so they're filtered there too
+    context = await crud.get_scene_check_context(
+        db, scene_id, "continuity", "character_must_appear"
+    )
     
-    if not draft or not scene:
+    if not draft or not context:
         raise ValueError("Draft or scene not found")
     
-    # Get project constraints and style bible
-    constraints_models = crud.get_constraints(db, scene.project_id)
-    constraints = [
-        {
-            "id": c.id,
-            "constraint_type": c.constraint_type,
-            "rule_jsonb": c.rule_jsonb,
-            "severity": c.severity
-        }
-        for c in constraints_models
-    ]
-    
-    # Get latest style bible
-    style_bible = {}
-    if scene.project.style_bibles:
-        latest_bible = max(scene.project.style_bibles, key=lambda x: x.version)
-        style_bible = latest_bible.content_jsonb
+    _, constraints, style_bible = context
+    style_bible = style_bible or {}
     
     # Run all checks
-    check_results = checks.run_all_checks(
+    check_results = await checks.run_all_checks(
+        db,
+        draft_id=draft_id,
         draft_text=draft.text,
         facts=facts,
         constraints=constraints,
-        style_bible=style_bible
+        style_bible=style_bible,
+        scene_id=scene_id
     )
     
     # Store check runs
+    await crud.create_check_runs(
+        db,
+        iteration_id=task.iteration_id,
+        draft_id=draft_id,
+        check_runs=[
+            {
+                "check_type": result.check_type,
+                "passed": result.passed,
+                "findings_jsonb": result.findings
+            }
+            for result in check_results
+        ],
+        commit=False
+    )
+    
     all_passed = True
     all_findings = []
-    
     for result in check_results:
-        crud.create_check_run(
-            db,
-            iteration_id=task.iteration_id,
-            draft_id=draft_id,
-            check_type=result.check_type,
-            passed=result.passed,
-            findings_jsonb=result.findings
-        )
-        
         if not result.passed:
             all_passed = False
         all_findings.extend(result.findings)
@@ -407,13 +568,13 @@ def handle_run_checks(db: Session, task: models.Task) -> dict[str, Any]:
     }
 
 
-def handle_revise(db: Session, task: models.Task) -> dict[str, Any]:
+async def handle_revise(db: AsyncSession, task: models.Task) -> dict[str, Any]:
     """Handle REVISE task."""
     scene_id = task.input_jsonb.get("scene_id")
     draft_id = task.input_jsonb.get("draft_id")
     findings = task.input_jsonb.get("findings", [])
     
-    draft = crud.get_draft(db, draft_id)
+    draft = await crud.get_draft(db, draft_id)
     
     if not draft:
         raise ValueError(f"Draft {draft_id} not found")
@@ -422,10 +583,11 @@ def handle_revise(db: Session, task: models.Task) -> dict[str, Any]:
     revised_text = extraction.revise_draft(draft.text, findings)
     
     # Create new draft version (append-only)
-    new_draft = crud.create_draft(
+    new_draft = await crud.create_draft(
         db,
         scene_id=scene_id,
-        draft=schemas.DraftCreate(text=revised_text)
+        draft=schemas.DraftCreate(text=revised_text),
+        commit=False
     )
     
     return {
@@ -436,12 +598,16 @@ def handle_revise(db: Session, task: models.Task) -> dict[str, Any]:
     }
 
 
-def handle_commit(db: Session, task: models.Task) -> dict[str, Any]:
+async def handle_commit(db: AsyncSession, task: models.Task) -> dict[str, Any]:
     """Handle COMMIT task."""
     scene_id = task.input_jsonb.get("scene_id")
     draft_id = task.input_jsonb.get("draft_id")
     
-    # In a real system, this might:
+    # The committed draft's facts become the scene's established facts
+    # once the next batched refresh of latest_fact_per_scene runs
+    schedule_latest_facts_refresh()
+    
+    # In a real system, this might also:
     # - Mark the draft as "final"
     # - Update scene metadata
     # - Trigger downstream processes
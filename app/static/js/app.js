@@ -76,7 +76,7 @@ function loadDashboardView() {
 
 async function loadProjects() {
     try {
-        const projects = await api.get('/projects');
+        const { items: projects } = await api.get('/projects');
         state.projects = projects;
         const grid = document.getElementById('project-list');
 
@@ -152,7 +152,7 @@ function renderProjectView() {
 
 async function loadProjectDetails(projectId) {
     // Load Characters
-    const chars = await api.get(`/projects/${projectId}/characters`);
+    const { items: chars } = await api.get(`/projects/${projectId}/characters`);
     state.characters = chars;
     document.getElementById('character-list').innerHTML = chars.map(c => `
         <div class="card" style="padding: 1rem;">
@@ -162,7 +162,7 @@ async function loadProjectDetails(projectId) {
     `).join('');
 
     // Load Scenes
-    const scenes = await api.get(`/projects/${projectId}/scenes`);
+    const { items: scenes } = await api.get(`/projects/${projectId}/scenes`);
     state.scenes = scenes;
     document.getElementById('scene-list').innerHTML = scenes.map(s => {
         const title = (s.card_jsonb && s.card_jsonb.title) ? s.card_jsonb.title : `Scene ${s.scene_no}`;
@@ -184,7 +184,7 @@ async function openScene(sceneId) {
     // Attempt to get latest draft content
     let content = "";
     try {
-        const drafts = await api.get(`/scenes/${sceneId}/drafts`);
+        const { items: drafts } = await api.get(`/scenes/${sceneId}/drafts`);
         if (drafts.length > 0) {
             content = drafts[0].text; // Fixed: DraftRead uses 'text' not 'content', verifying schema... DraftBase: text: str.
         }
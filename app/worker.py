@@ -1,25 +1,32 @@
 """
 RQ Worker for processing pipeline tasks.
 """
-import os
-from redis import Redis
-from rq import Worker, Queue
+import logging
+import sys
+from rq import Worker
 
+# The same cached connection and queue the pipeline enqueues to; importing
+# the pipeline here also preloads it for the forked work horses
+from app.services.pipeline import get_redis_connection, get_task_queue
 
-def get_redis_connection() -> Redis:
-    """Get Redis connection from environment."""
-    redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-    return Redis.from_url(redis_url)
+logger = logging.getLogger("novel_engine.worker")
 
 
 def main():
     """Main worker entry point."""
-    redis_conn = get_redis_connection()
-    queues = [Queue("novel-engine", connection=redis_conn)]
-    worker = Worker(queues, connection=redis_conn)
-    print("Starting Novel Engine worker...")
-    print(f"Listening on queues: {[q.name for q in queues]}")
-    worker.work()
+    # One root handler for the worker and RQ alike; RQ only installs its
+    # own handlers when none is in effect, so nothing is logged twice
+    logging.basicConfig(
+        level=logging.INFO,
+        stream=sys.stdout,
+        format="%(asctime)s %(name)s %(levelname)s %(message)s"
+    )
+    queues = [get_task_queue()]
+    worker = Worker(queues, connection=get_redis_connection())
+    logger.info("Starting Novel Engine worker...")
+    logger.info("Listening on queues: %s", [q.name for q in queues])
+    # The scheduler releases the delayed latest_fact_per_scene refreshes
+    worker.work(with_scheduler=True)
 
 
 if __name__ == "__main__":
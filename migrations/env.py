@@ -18,6 +18,7 @@ if config.config_file_name is not None:
 # add your model's MetaData object here
 # for 'autogenerate' support
 from app.models import Base
+from migrations.timeouts import SESSION_SETTINGS
 target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
@@ -55,6 +56,8 @@ def run_migrations_offline() -> None:
     )
 
     with context.begin_transaction():
+        for name, value in SESSION_SETTINGS.items():
+            context.execute(f"SET {name} = '{value}'")
         context.run_migrations()
 
 
@@ -72,6 +75,11 @@ def run_migrations_online() -> None:
         configuration,
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
+        # Set at connect time so they hold across the autocommit blocks too;
+        # concurrent_block() lifts them around index builds
+        connect_args={
+            "options": " ".join(f"-c {name}={value}" for name, value in SESSION_SETTINGS.items())
+        },
     )
 
     with connectable.connect() as connection:
@@ -0,0 +1,37 @@
+"""
+Session timeouts for migration connections, and the autocommit block that
+lifts them for concurrent index builds.
+"""
+import os
+from contextlib import contextmanager
+
+from alembic import op
+
+# Session settings for every migration connection. A DDL statement that
+# queues behind a long transaction for its lock would block all readers and
+# writers of the table queued behind it, so it gives up after lock_timeout
+# instead; statement_timeout bounds a runaway rewrite.
+SESSION_SETTINGS = {
+    "lock_timeout": os.getenv("MIGRATION_LOCK_TIMEOUT", "3s"),
+    "statement_timeout": os.getenv("MIGRATION_STATEMENT_TIMEOUT", "30min"),
+}
+
+
+@contextmanager
+def concurrent_block():
+    """
+    An autocommit block for CREATE/DROP INDEX CONCURRENTLY, with the
+    session timeouts lifted.
+
+    A concurrent build waits out every transaction older than itself and
+    holds no lock that blocks other sessions, so there is nothing for the
+    timeouts to protect; a build they cancel leaves an INVALID index that
+    if_not_exists would keep on the next run. The session values are put
+    back when the block ends.
+    """
+    with op.get_context().autocommit_block():
+        for name in SESSION_SETTINGS:
+            op.execute(f"SET {name} = 0")
+        yield
+        for name, value in SESSION_SETTINGS.items():
+            op.execute(f"SET {name} = '{value}'")
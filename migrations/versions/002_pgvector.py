@@ -7,7 +7,7 @@ Create Date: 2024-01-01 00:01:00.000000
 """
 from typing import Sequence, Union
 
-from alembic import op
+from alembic import context, op
 import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
@@ -17,44 +17,50 @@ branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
+def _vector_available() -> bool:
+    """Whether the server has the pgvector extension to install."""
+    if context.is_offline_mode():
+        # No database to ask; the emitted SQL assumes it is there
+        return True
+    return op.get_bind().scalar(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'vector'")
+    ) is not None
+
+
 def upgrade() -> None:
     """
     Add pgvector extension and embedding column to fact table.
     
     This migration is designed to work with or without pgvector installed.
-    If pgvector is not available, the extension creation will fail silently
-    and the embedding column won't be added.
+    If the server has no pgvector to install, the migration does nothing
+    and the embedding column won't be added. Any other failure propagates
+    and rolls the migration back.
     """
-    # Try to create the vector extension
-    # This will fail if pgvector is not installed, but we catch the error
-    try:
-        op.execute('CREATE EXTENSION IF NOT EXISTS vector')
-        
-        # Only add the embedding column if the extension was created successfully
-        # Using raw SQL because SQLAlchemy doesn't natively support the vector type
-        op.execute('''
-            ALTER TABLE fact 
-            ADD COLUMN IF NOT EXISTS embedding vector(1536)
-        ''')
-        
-        # Create an index for similarity search (optional, for performance)
-        op.execute('''
-            CREATE INDEX IF NOT EXISTS ix_fact_embedding 
-            ON fact 
-            USING ivfflat (embedding vector_cosine_ops)
-            WITH (lists = 100)
-        ''')
-        
-    except Exception as e:
+    if not _vector_available():
         # pgvector not available - this is fine, the system works without embeddings
-        print(f"Note: pgvector extension not available ({e}). Embeddings disabled.")
+        print("Note: pgvector extension not available. Embeddings disabled.")
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS vector')
+
+    # Using raw SQL because SQLAlchemy doesn't natively support the vector type
+    op.execute('''
+        ALTER TABLE fact 
+        ADD COLUMN IF NOT EXISTS embedding vector(1536)
+    ''')
+
+    # Create an index for similarity search (optional, for performance)
+    op.execute('''
+        CREATE INDEX IF NOT EXISTS ix_fact_embedding 
+        ON fact 
+        USING ivfflat (embedding vector_cosine_ops)
+        WITH (lists = 100)
+    ''')
 
 
 def downgrade() -> None:
     """Remove pgvector support."""
-    try:
-        op.execute('DROP INDEX IF EXISTS ix_fact_embedding')
-        op.execute('ALTER TABLE fact DROP COLUMN IF EXISTS embedding')
-        # Note: We don't drop the extension as other tables might use it
-    except Exception:
-        pass  # Extension wasn't installed
+    # Both are no-ops where the extension was never installed
+    op.execute('DROP INDEX IF EXISTS ix_fact_embedding')
+    op.execute('ALTER TABLE fact DROP COLUMN IF EXISTS embedding')
+    # Note: We don't drop the extension as other tables might use it
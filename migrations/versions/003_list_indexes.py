@@ -0,0 +1,68 @@
+"""Add composite indexes for keyset pagination and filtered lists
+
+Revision ID: 003_list_indexes
+Revises: 002_pgvector
+Create Date: 2024-01-02 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.timeouts import concurrent_block
+
+# revision identifiers, used by Alembic.
+revision: str = '003_list_indexes'
+down_revision: Union[str, None] = '002_pgvector'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_character_project', 'character', ['project_id', 'id']),
+    ('ix_location_project', 'location', ['project_id', 'id']),
+    ('ix_scene_project_chapter', 'scene', ['project_id', 'chapter_no', 'scene_no', 'id']),
+    ('ix_fact_source_draft', 'fact', ['source_draft_id']),
+    ('ix_constraint_project', 'constraint', ['project_id', 'id']),
+    ('ix_task_iteration_status', 'task', ['iteration_id', 'status', 'id']),
+]
+
+
+def upgrade() -> None:
+    """
+    Build the list-query indexes without blocking writers.
+
+    CREATE INDEX CONCURRENTLY cannot run inside a transaction, so the
+    statements are issued from an autocommit block.
+    """
+    with concurrent_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        # Superseded by ix_scene_project_chapter (and uq_scene_ordering)
+        op.drop_index(
+            'ix_scene_ordering', table_name='scene',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with concurrent_block():
+        op.create_index(
+            'ix_scene_ordering', 'scene', ['project_id', 'chapter_no', 'scene_no'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,32 @@
+"""Enforce unique iteration numbers per scene
+
+Revision ID: 004_iteration_unique_no
+Revises: 003_list_indexes
+Create Date: 2024-01-03 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '004_iteration_unique_no'
+down_revision: Union[str, None] = '003_list_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Let concurrent iteration inserts fail cleanly instead of reusing a number.
+
+    Mirrors uq_draft_scene_version, which already guards draft versions.
+    """
+    op.create_unique_constraint(
+        'uq_iteration_scene_no', 'iteration', ['scene_id', 'iteration_no']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_iteration_scene_no', 'iteration', type_='unique')
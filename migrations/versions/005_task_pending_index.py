@@ -0,0 +1,45 @@
+"""Add a partial index for dequeuing pending tasks
+
+Revision ID: 005_task_pending_index
+Revises: 004_iteration_unique_no
+Create Date: 2024-01-04 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.timeouts import concurrent_block
+
+# revision identifiers, used by Alembic.
+revision: str = '005_task_pending_index'
+down_revision: Union[str, None] = '004_iteration_unique_no'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Index only pending tasks, which is all get_pending_task ever reads.
+
+    CREATE INDEX CONCURRENTLY cannot run inside a transaction, so the
+    statement is issued from an autocommit block.
+    """
+    with concurrent_block():
+        op.create_index(
+            'ix_task_pending', 'task', ['iteration_id', 'id'],
+            unique=False,
+            postgresql_where=sa.text("status = 'pending'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with concurrent_block():
+        op.drop_index(
+            'ix_task_pending', table_name='task',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,44 @@
+"""Add a descending draft version index for latest-draft lookups
+
+Revision ID: 006_draft_latest_index
+Revises: 005_task_pending_index
+Create Date: 2024-01-05 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.timeouts import concurrent_block
+
+# revision identifiers, used by Alembic.
+revision: str = '006_draft_latest_index'
+down_revision: Union[str, None] = '005_task_pending_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Serve DISTINCT ON (scene_id) ... ORDER BY scene_id, version DESC from an index.
+
+    Draft text is deliberately not INCLUDEd: large drafts would exceed the
+    B-tree row size limit.
+    """
+    with concurrent_block():
+        op.create_index(
+            'ix_draft_scene_version_desc', 'draft', ['scene_id', sa.text('version DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with concurrent_block():
+        op.drop_index(
+            'ix_draft_scene_version_desc', table_name='draft',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,28 @@
+"""Move task input and check-run findings defaults to the server
+
+Revision ID: 007_jsonb_server_defaults
+Revises: 006_draft_latest_index
+Create Date: 2024-01-06 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '007_jsonb_server_defaults'
+down_revision: Union[str, None] = '006_draft_latest_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Let inserts omit empty JSONB payloads and have Postgres fill them in."""
+    op.alter_column('task', 'input_jsonb', server_default=sa.text("'{}'::jsonb"))
+    op.alter_column('check_run', 'findings_jsonb', server_default=sa.text("'[]'::jsonb"))
+
+
+def downgrade() -> None:
+    op.alter_column('check_run', 'findings_jsonb', server_default=None)
+    op.alter_column('task', 'input_jsonb', server_default=None)
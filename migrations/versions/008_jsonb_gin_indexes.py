@@ -0,0 +1,30 @@
+"""Reserved for GIN indexes on JSONB bodies (no-op)
+
+Revision ID: 008_jsonb_gin_indexes
+Revises: 007_jsonb_server_defaults
+Create Date: 2024-01-07 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '008_jsonb_gin_indexes'
+down_revision: Union[str, None] = '007_jsonb_server_defaults'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    No-op. GIN jsonb_path_ops indexes on the JSONB bodies were planned here
+    for @> containment filters, but no query filters by containment, so
+    the indexes would only add write cost. Kept so the revision chain is
+    unchanged.
+    """
+
+
+def downgrade() -> None:
+    pass
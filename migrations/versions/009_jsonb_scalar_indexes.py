@@ -0,0 +1,55 @@
+"""Add B-tree expression indexes on filtered JSONB scalars
+
+Revision ID: 009_jsonb_scalar_indexes
+Revises: 008_jsonb_gin_indexes
+Create Date: 2024-01-08 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.timeouts import concurrent_block
+
+# revision identifiers, used by Alembic.
+revision: str = '009_jsonb_scalar_indexes'
+down_revision: Union[str, None] = '008_jsonb_gin_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+EXPRESSION_INDEXES = [
+    ('ix_constraint_rule_type', 'constraint',
+     ['project_id', 'constraint_type', sa.text("(rule_jsonb ->> 'type')")]),
+    ('ix_scene_card_pov', 'scene',
+     ['project_id', sa.text("(card_jsonb ->> 'pov')")]),
+]
+
+
+def upgrade() -> None:
+    """
+    Index the JSONB keys that are compared with ->> equality.
+
+    GIN indexes only serve containment operators, so single-key lookups
+    need a B-tree over the extracted text. Built concurrently from an
+    autocommit block.
+    """
+    with concurrent_block():
+        for name, table, expressions in EXPRESSION_INDEXES:
+            op.create_index(
+                name, table, expressions,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with concurrent_block():
+        for name, table, _ in reversed(EXPRESSION_INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
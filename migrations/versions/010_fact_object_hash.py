@@ -0,0 +1,52 @@
+"""Denormalize a hash of fact objects for contradiction lookups
+
+Revision ID: 010_fact_object_hash
+Revises: 009_jsonb_scalar_indexes
+Create Date: 2024-01-09 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '010_fact_object_hash'
+down_revision: Union[str, None] = '009_jsonb_scalar_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# jsonb::text is canonical (keys sorted, whitespace normalized), so equal
+# objects always hash equally regardless of how they were written.
+OBJECT_HASH_EXPR = "encode(sha256(convert_to({}::text, 'UTF8')), 'hex')"
+
+
+def upgrade() -> None:
+    """
+    Add fact.object_hash, kept current by a trigger.
+
+    The hash lets contradiction checks compare objects with a narrow
+    column instead of whole JSONB values.
+    """
+    op.add_column('fact', sa.Column('object_hash', sa.String(length=64), nullable=True))
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION fact_set_object_hash() RETURNS trigger AS $$
+        BEGIN
+            NEW.object_hash := {OBJECT_HASH_EXPR.format('NEW.object_jsonb')};
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER fact_object_hash
+        BEFORE INSERT OR UPDATE OF object_jsonb ON fact
+        FOR EACH ROW EXECUTE FUNCTION fact_set_object_hash()
+    """)
+    op.execute(f"UPDATE fact SET object_hash = {OBJECT_HASH_EXPR.format('object_jsonb')}")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS fact_object_hash ON fact")
+    op.execute("DROP FUNCTION IF EXISTS fact_set_object_hash()")
+    op.drop_column('fact', 'object_hash')
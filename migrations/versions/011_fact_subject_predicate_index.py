@@ -0,0 +1,43 @@
+"""Add fact (source_draft_id, subject, predicate) index for contradiction joins
+
+Revision ID: 011_fact_subject_predicate
+Revises: 010_fact_object_hash
+Create Date: 2024-01-10 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.timeouts import concurrent_block
+
+# revision identifiers, used by Alembic.
+revision: str = '011_fact_subject_predicate'
+down_revision: Union[str, None] = '010_fact_object_hash'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Index a draft's facts by subject and predicate so the contradiction
+    lookup can start from them.
+    """
+    with concurrent_block():
+        op.create_index(
+            'ix_fact_subject_predicate', 'fact',
+            ['source_draft_id', 'subject_type', 'subject_id', 'predicate'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with concurrent_block():
+        op.drop_index(
+            'ix_fact_subject_predicate', table_name='fact',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
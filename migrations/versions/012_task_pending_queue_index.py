@@ -0,0 +1,30 @@
+"""Reserved for a global pending-task queue index (no-op)
+
+Revision ID: 012_task_pending_queue
+Revises: 011_fact_subject_predicate
+Create Date: 2024-01-11 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '012_task_pending_queue'
+down_revision: Union[str, None] = '011_fact_subject_predicate'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    No-op. A partial index over pending tasks in arrival order was planned
+    here for a global dequeue, but workers claim tasks by ID from their RQ
+    job, so nothing reads the queue in that order. Kept so the revision
+    chain is unchanged.
+    """
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,52 @@
+"""Default created_at/updated_at to now() in the database
+
+Revision ID: 013_timestamp_server_defaults
+Revises: 012_task_pending_queue
+Create Date: 2024-01-12 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '013_timestamp_server_defaults'
+down_revision: Union[str, None] = '012_task_pending_queue'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TIMESTAMP_COLUMNS = [
+    ('project', ['created_at', 'updated_at']),
+    ('style_bible', ['created_at']),
+    ('character', ['created_at', 'updated_at']),
+    ('location', ['created_at', 'updated_at']),
+    ('scene', ['created_at', 'updated_at']),
+    ('draft', ['created_at']),
+    ('event', ['created_at']),
+    ('fact', ['created_at']),
+    ('constraint', ['created_at']),
+    ('entity_link', ['created_at']),
+    ('iteration', ['created_at', 'updated_at']),
+    ('check_run', ['created_at']),
+    ('task', ['created_at', 'updated_at']),
+]
+
+
+def upgrade() -> None:
+    """
+    Let Postgres stamp new rows, so inserts (including COPY) can omit them.
+
+    Setting a column default only touches the catalog; existing rows are
+    not rewritten.
+    """
+    for table, columns in TIMESTAMP_COLUMNS:
+        for column in columns:
+            op.alter_column(table, column, server_default=sa.func.now())
+
+
+def downgrade() -> None:
+    for table, columns in reversed(TIMESTAMP_COLUMNS):
+        for column in columns:
+            op.alter_column(table, column, server_default=None)
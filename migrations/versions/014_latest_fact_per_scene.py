@@ -0,0 +1,57 @@
+"""Add latest_fact_per_scene materialized view for continuity checks
+
+Revision ID: 014_latest_fact_per_scene
+Revises: 013_timestamp_server_defaults
+Create Date: 2024-01-13 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '014_latest_fact_per_scene'
+down_revision: Union[str, None] = '013_timestamp_server_defaults'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Project the newest fact per (scene, subject, predicate).
+
+    REFRESH ... CONCURRENTLY needs a unique index on the view; fact_id is
+    used because subject_id may be NULL.
+    """
+    op.execute("""
+        CREATE MATERIALIZED VIEW latest_fact_per_scene AS
+        SELECT DISTINCT ON (d.scene_id, f.subject_type, f.subject_id, f.predicate)
+            f.id AS fact_id,
+            s.project_id,
+            d.scene_id,
+            f.subject_type,
+            f.subject_id,
+            f.predicate,
+            f.object_jsonb,
+            f.object_hash,
+            f.created_at
+        FROM fact f
+        JOIN draft d ON d.id = f.source_draft_id
+        JOIN scene s ON s.id = d.scene_id
+        ORDER BY d.scene_id, f.subject_type, f.subject_id, f.predicate,
+                 f.created_at DESC, f.id DESC
+    """)
+    op.create_index(
+        'ux_latest_fact_per_scene_fact', 'latest_fact_per_scene', ['fact_id'],
+        unique=True,
+    )
+    op.create_index(
+        'ix_latest_fact_per_scene_subject', 'latest_fact_per_scene',
+        ['project_id', 'subject_type', 'subject_id', 'predicate'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS latest_fact_per_scene")
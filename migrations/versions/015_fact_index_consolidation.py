@@ -0,0 +1,50 @@
+"""Drop the fact index superseded by ix_fact_subject_predicate
+
+Revision ID: 015_fact_index_consolidation
+Revises: 014_latest_fact_per_scene
+Create Date: 2024-01-14 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.timeouts import concurrent_block
+
+# revision identifiers, used by Alembic.
+revision: str = '015_fact_index_consolidation'
+down_revision: Union[str, None] = '014_latest_fact_per_scene'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    # Prefix of ix_fact_subject_predicate
+    ('ix_fact_source_draft', ['source_draft_id']),
+]
+
+
+def upgrade() -> None:
+    """
+    Leave ix_fact_subject_predicate as the one B-tree on fact's lookup
+    columns, so each extracted fact maintains fewer indexes.
+    """
+    with concurrent_block():
+        for name, _ in INDEXES:
+            op.drop_index(
+                name, table_name='fact',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with concurrent_block():
+        for name, columns in reversed(INDEXES):
+            op.create_index(
+                name, 'fact', columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
@@ -0,0 +1,43 @@
+"""Add partial index over low-confidence facts
+
+Revision ID: 016_fact_low_confidence
+Revises: 015_fact_index_consolidation
+Create Date: 2024-01-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.timeouts import concurrent_block
+
+# revision identifiers, used by Alembic.
+revision: str = '016_fact_low_confidence'
+down_revision: Union[str, None] = '015_fact_index_consolidation'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Index only the facts the continuity check warns about, so the lookup
+    touches a small fraction of the table.
+    """
+    with concurrent_block():
+        op.create_index(
+            'ix_fact_low_confidence', 'fact', ['source_draft_id', 'id'],
+            unique=False,
+            postgresql_where=sa.text("confidence < 0.7"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with concurrent_block():
+        op.drop_index(
+            'ix_fact_low_confidence', table_name='fact',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,82 @@
+"""Store constraint severity and iteration/task status as enums
+
+Revision ID: 017_status_enums
+Revises: 016_fact_low_confidence
+Create Date: 2024-01-16 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '017_status_enums'
+down_revision: Union[str, None] = '016_fact_low_confidence'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column, enum type, values, server default)
+ENUM_COLUMNS = [
+    ('constraint', 'severity', 'constraint_severity', ('error', 'warning', 'info'), 'error'),
+    ('iteration', 'status', 'iteration_status', ('pending', 'running', 'passed', 'failed'), 'pending'),
+    ('task', 'status', 'task_status', ('pending', 'running', 'completed', 'failed'), 'pending'),
+]
+
+# Partial indexes whose predicate compares task.status to a text literal
+PENDING_INDEXES = [
+    ('ix_task_pending', ['iteration_id', 'id']),
+]
+
+
+def _drop_pending_indexes() -> None:
+    for name, _ in PENDING_INDEXES:
+        op.drop_index(name, table_name='task', if_exists=True)
+
+
+def _create_pending_indexes() -> None:
+    for name, columns in PENDING_INDEXES:
+        op.create_index(
+            name, 'task', columns,
+            unique=False,
+            postgresql_where=sa.text("status = 'pending'"),
+        )
+
+
+def upgrade() -> None:
+    """
+    Convert the fixed-vocabulary string columns to 4-byte enums.
+
+    The column type change rewrites each table, so this runs in the
+    migration transaction rather than concurrently. Column defaults and
+    the pending-task partial indexes are dropped and recreated around the
+    change so they are re-parsed against the enum type.
+    """
+    _drop_pending_indexes()
+    for table, column, type_name, values, default in ENUM_COLUMNS:
+        enum = postgresql.ENUM(*values, name=type_name)
+        enum.create(op.get_bind(), checkfirst=False)
+        op.alter_column(table, column, server_default=None)
+        op.alter_column(
+            table, column,
+            type_=enum,
+            postgresql_using=f"{column}::text::{type_name}",
+        )
+        op.alter_column(table, column, server_default=default)
+    _create_pending_indexes()
+
+
+def downgrade() -> None:
+    _drop_pending_indexes()
+    for table, column, type_name, _, default in reversed(ENUM_COLUMNS):
+        op.alter_column(table, column, server_default=None)
+        op.alter_column(
+            table, column,
+            type_=sa.String(length=20),
+            postgresql_using=f"{column}::text",
+        )
+        op.alter_column(table, column, server_default=default)
+        postgresql.ENUM(name=type_name).drop(op.get_bind(), checkfirst=False)
+    _create_pending_indexes()
@@ -0,0 +1,90 @@
+"""Switch the fact embedding index from IVFFlat to HNSW
+
+Revision ID: 018_fact_embedding_hnsw
+Revises: 017_status_enums
+Create Date: 2024-01-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from migrations.timeouts import concurrent_block
+
+# revision identifiers, used by Alembic.
+revision: str = '018_fact_embedding_hnsw'
+down_revision: Union[str, None] = '017_status_enums'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+
+def _has_embedding() -> bool:
+    """fact.embedding only exists where 002_pgvector found the extension."""
+    if context.is_offline_mode():
+        # No database to ask; the emitted SQL assumes the column is there
+        return True
+    columns = sa.inspect(op.get_bind()).get_columns('fact')
+    return any(column['name'] == 'embedding' for column in columns)
+
+
+def _has_hnsw() -> bool:
+    """HNSW arrived in pgvector 0.5.0; older installs keep IVFFlat."""
+    if context.is_offline_mode():
+        return True
+    version = op.get_bind().scalar(
+        sa.text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    )
+    return version is not None and tuple(map(int, version.split('.')[:2])) >= (0, 5)
+
+
+def _swap_embedding_index(using: str, **kwargs) -> None:
+    """
+    Replace ix_fact_embedding with an index of the given access method.
+
+    The new index is built concurrently under a temporary name before the
+    old one is dropped, so fact stays writable and similarity search keeps
+    an index throughout.
+    """
+    with concurrent_block():
+        # Left over (possibly INVALID) if an earlier run stopped part way
+        op.drop_index(
+            'ix_fact_embedding_new', table_name='fact',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.create_index(
+            'ix_fact_embedding_new', 'fact', ['embedding'],
+            unique=False,
+            postgresql_using=using,
+            postgresql_ops={'embedding': 'vector_cosine_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+            **kwargs,
+        )
+        op.drop_index(
+            'ix_fact_embedding', table_name='fact',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.execute('ALTER INDEX ix_fact_embedding_new RENAME TO ix_fact_embedding')
+
+
+def upgrade() -> None:
+    """
+    Replace the IVFFlat index with HNSW.
+
+    IVFFlat picks its list centroids when the index is built, which was on
+    an empty table, so recall degrades as facts arrive. HNSW needs no
+    training step and keeps lookups fast as the table grows. Skipped
+    where pgvector predates HNSW support.
+    """
+    if _has_embedding() and _has_hnsw():
+        # pgvector's defaults, spelled out so the build is reproducible
+        _swap_embedding_index('hnsw', postgresql_with={'m': 16, 'ef_construction': 64})
+
+
+def downgrade() -> None:
+    if _has_embedding() and _has_hnsw():
+        _swap_embedding_index('ivfflat', postgresql_with={'lists': 100})
@@ -0,0 +1,78 @@
+"""Store fact embeddings as halfvec
+
+Revision ID: 019_fact_embedding_halfvec
+Revises: 018_fact_embedding_hnsw
+Create Date: 2024-01-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from migrations.timeouts import concurrent_block
+
+# revision identifiers, used by Alembic.
+revision: str = '019_fact_embedding_halfvec'
+down_revision: Union[str, None] = '018_fact_embedding_hnsw'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_halfvec_embedding() -> bool:
+    """
+    fact.embedding only exists where 002_pgvector found the extension, and
+    halfvec (with HNSW support for it) arrived in pgvector 0.7.0.
+    """
+    if context.is_offline_mode():
+        # No database to ask; the emitted SQL assumes both are there
+        return True
+    bind = op.get_bind()
+    columns = sa.inspect(bind).get_columns('fact')
+    if not any(column['name'] == 'embedding' for column in columns):
+        return False
+    version = bind.scalar(
+        sa.text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    )
+    return version is not None and tuple(map(int, version.split('.')[:2])) >= (0, 7)
+
+
+def _retype_embedding(column_type: str, ops: str) -> None:
+    """
+    Rewrite fact.embedding as column_type and rebuild its HNSW index.
+
+    The old index's operator class doesn't apply to the new type, so it is
+    dropped before the rewrite and rebuilt concurrently afterwards.
+    """
+    op.drop_index('ix_fact_embedding', table_name='fact', if_exists=True)
+    op.execute(
+        f'ALTER TABLE fact ALTER COLUMN embedding TYPE {column_type} '
+        f'USING embedding::{column_type}'
+    )
+    with concurrent_block():
+        op.create_index(
+            'ix_fact_embedding', 'fact', ['embedding'],
+            unique=False,
+            postgresql_using='hnsw',
+            postgresql_ops={'embedding': ops},
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def upgrade() -> None:
+    """
+    Halve the size of stored embeddings with 16-bit floats.
+
+    Similarity search over 1536 dimensions is bound by how many bytes it
+    reads; halfvec keeps cosine ranking close to float32 at half the heap
+    and index size. The column rewrite holds an exclusive lock on fact.
+    """
+    if _has_halfvec_embedding():
+        _retype_embedding('halfvec(1536)', 'halfvec_cosine_ops')
+
+
+def downgrade() -> None:
+    if _has_halfvec_embedding():
+        _retype_embedding('vector(1536)', 'vector_cosine_ops')
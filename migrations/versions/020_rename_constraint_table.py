@@ -0,0 +1,49 @@
+"""Rename the constraint table to story_constraint
+
+Revision ID: 020_rename_constraint_table
+Revises: 019_fact_embedding_halfvec
+Create Date: 2024-01-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '020_rename_constraint_table'
+down_revision: Union[str, None] = '019_fact_embedding_halfvec'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Objects named after the table when 001_initial created it
+RENAMED_OBJECTS = [
+    ('SEQUENCE', 'constraint_id_seq', 'story_constraint_id_seq'),
+    ('INDEX', 'constraint_pkey', 'story_constraint_pkey'),
+    ('INDEX', 'ix_constraint_id', 'ix_story_constraint_id'),
+]
+
+
+def upgrade() -> None:
+    """
+    CONSTRAINT is a reserved word, so the old name had to be quoted in
+    every statement and psql session. Renames are catalog-only changes.
+    """
+    op.rename_table('constraint', 'story_constraint')
+    for kind, old, new in RENAMED_OBJECTS:
+        op.execute(f'ALTER {kind} {old} RENAME TO {new}')
+    op.execute(
+        'ALTER TABLE story_constraint '
+        'RENAME CONSTRAINT constraint_project_id_fkey TO story_constraint_project_id_fkey'
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        'ALTER TABLE story_constraint '
+        'RENAME CONSTRAINT story_constraint_project_id_fkey TO constraint_project_id_fkey'
+    )
+    for kind, old, new in reversed(RENAMED_OBJECTS):
+        op.execute(f'ALTER {kind} {new} RENAME TO {old}')
+    op.rename_table('story_constraint', 'constraint')
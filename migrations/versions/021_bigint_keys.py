@@ -0,0 +1,88 @@
+"""Widen high-volume keys to BIGINT
+
+Revision ID: 021_bigint_keys
+Revises: 020_rename_constraint_table
+Create Date: 2024-01-20 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '021_bigint_keys'
+down_revision: Union[str, None] = '020_rename_constraint_table'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Tables whose serial id is widened, with every column holding one of
+# those ids. Project-level tables stay INT4.
+BIGINT_COLUMNS = [
+    ('draft', ['id']),
+    ('iteration', ['id']),
+    ('fact', ['id', 'source_draft_id']),
+    ('check_run', ['id', 'iteration_id', 'draft_id']),
+    ('task', ['id', 'iteration_id']),
+    ('entity_link', ['id', 'from_id', 'to_id']),
+]
+
+# Same definition as 014_latest_fact_per_scene; the view pins the types of
+# fact.id, fact.source_draft_id and draft.id, so it is rebuilt around the
+# change.
+LATEST_FACT_PER_SCENE = """
+    CREATE MATERIALIZED VIEW latest_fact_per_scene AS
+    SELECT DISTINCT ON (d.scene_id, f.subject_type, f.subject_id, f.predicate)
+        f.id AS fact_id,
+        s.project_id,
+        d.scene_id,
+        f.subject_type,
+        f.subject_id,
+        f.predicate,
+        f.object_jsonb,
+        f.object_hash,
+        f.created_at
+    FROM fact f
+    JOIN draft d ON d.id = f.source_draft_id
+    JOIN scene s ON s.id = d.scene_id
+    ORDER BY d.scene_id, f.subject_type, f.subject_id, f.predicate,
+             f.created_at DESC, f.id DESC
+"""
+
+
+def _retype_keys(column_type: str) -> None:
+    op.execute('DROP MATERIALIZED VIEW IF EXISTS latest_fact_per_scene')
+    for table, columns in BIGINT_COLUMNS:
+        # One ALTER per table, so each is rewritten once
+        op.execute(
+            f'ALTER TABLE {table} '
+            + ', '.join(f'ALTER COLUMN {column} TYPE {column_type}' for column in columns)
+        )
+        op.execute(f'ALTER SEQUENCE {table}_id_seq AS {column_type}')
+    op.execute(LATEST_FACT_PER_SCENE)
+    op.create_index(
+        'ux_latest_fact_per_scene_fact', 'latest_fact_per_scene', ['fact_id'],
+        unique=True,
+    )
+    op.create_index(
+        'ix_latest_fact_per_scene_subject', 'latest_fact_per_scene',
+        ['project_id', 'subject_type', 'subject_id', 'predicate'],
+        unique=False,
+    )
+
+
+def upgrade() -> None:
+    """
+    Move the per-iteration tables off 4-byte ids.
+
+    Drafts, facts, check runs and tasks are written on every pipeline
+    step and would exhaust INT4 long before the project tables do. The
+    rewrite takes exclusive locks, so it is cheapest while the tables are
+    still small.
+    """
+    _retype_keys('bigint')
+
+
+def downgrade() -> None:
+    _retype_keys('integer')
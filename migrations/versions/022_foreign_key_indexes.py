@@ -0,0 +1,62 @@
+"""Index the foreign keys no other index leads with
+
+Revision ID: 022_foreign_key_indexes
+Revises: 021_bigint_keys
+Create Date: 2024-01-21 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.timeouts import concurrent_block
+
+# revision identifiers, used by Alembic.
+revision: str = '022_foreign_key_indexes'
+down_revision: Union[str, None] = '021_bigint_keys'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, column, partial); nullable SET NULL references only index
+# the rows that actually point somewhere
+FK_INDEXES = [
+    ('ix_event_project', 'event', 'project_id', False),
+    ('ix_scene_pov_character', 'scene', 'pov_character_id', True),
+    ('ix_entity_link_valid_from', 'entity_link', 'valid_from_scene_id', True),
+    ('ix_entity_link_valid_to', 'entity_link', 'valid_to_scene_id', True),
+    ('ix_check_run_iteration', 'check_run', 'iteration_id', False),
+    ('ix_check_run_draft', 'check_run', 'draft_id', False),
+]
+
+
+def upgrade() -> None:
+    """
+    Give every foreign key an index it leads.
+
+    Deleting a parent row looks up its children by the referencing
+    column; without an index each cascade or SET NULL scans the child
+    table. check_run.iteration_id also serves Iteration.check_runs'
+    selectin load. The other foreign keys already lead a composite or
+    unique index. Built concurrently from an autocommit block.
+    """
+    with concurrent_block():
+        for name, table, column, partial in FK_INDEXES:
+            op.create_index(
+                name, table, [column],
+                unique=False,
+                postgresql_where=sa.text(f'{column} IS NOT NULL') if partial else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with concurrent_block():
+        for name, table, _, _ in reversed(FK_INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
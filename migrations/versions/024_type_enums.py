@@ -0,0 +1,57 @@
+"""Store task and check run types as enums
+
+Revision ID: 024_type_enums
+Revises: 023_toast_lz4
+Create Date: 2024-01-23 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '024_type_enums'
+down_revision: Union[str, None] = '023_toast_lz4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column, enum type, values)
+ENUM_COLUMNS = [
+    ('task', 'task_type', 'task_type',
+     ('PLAN_SCENE', 'DRAFT_SCENE', 'EXTRACT_FACTS', 'RUN_CHECKS', 'REVISE', 'COMMIT')),
+    ('check_run', 'check_type', 'check_type', ('continuity', 'style')),
+]
+
+
+def upgrade() -> None:
+    """
+    Convert the two remaining closed vocabularies on the per-iteration
+    tables, the pipeline's task types and the check kinds, to 4-byte
+    enums, as 017 did for the status columns.
+
+    fact_type, subject_type, constraint_type and the entity_link types
+    are open-ended (chosen by the extractor or the user) and stay text.
+    The column type change rewrites each table inside the migration
+    transaction.
+    """
+    for table, column, type_name, values in ENUM_COLUMNS:
+        enum = postgresql.ENUM(*values, name=type_name)
+        enum.create(op.get_bind(), checkfirst=False)
+        op.alter_column(
+            table, column,
+            type_=enum,
+            postgresql_using=f"{column}::text::{type_name}",
+        )
+
+
+def downgrade() -> None:
+    for table, column, type_name, _ in reversed(ENUM_COLUMNS):
+        op.alter_column(
+            table, column,
+            type_=sa.String(length=50),
+            postgresql_using=f"{column}::text",
+        )
+        postgresql.ENUM(name=type_name).drop(op.get_bind(), checkfirst=False)
@@ -0,0 +1,43 @@
+"""Add range checks on fact confidence and scene ordering
+
+Revision ID: 025_check_constraints
+Revises: 024_type_enums
+Create Date: 2024-01-24 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '025_check_constraints'
+down_revision: Union[str, None] = '024_type_enums'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CHECK_CONSTRAINTS = [
+    ('ck_fact_confidence', 'fact', 'confidence >= 0 AND confidence <= 1'),
+    ('ck_scene_ordering', 'scene', 'chapter_no >= 0 AND scene_no >= 0'),
+]
+
+
+def upgrade() -> None:
+    """
+    Declare the value ranges the app already assumes.
+
+    Each check is added NOT VALID, which only needs a brief lock, and
+    validated after the migration transaction commits; validation scans
+    the table without blocking writes.
+    """
+    for name, table, condition in CHECK_CONSTRAINTS:
+        op.create_check_constraint(name, table, sa.text(condition), postgresql_not_valid=True)
+    with op.get_context().autocommit_block():
+        for name, table, _ in CHECK_CONSTRAINTS:
+            op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {name}')
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(CHECK_CONSTRAINTS):
+        op.drop_constraint(name, table, type_='check')
@@ -0,0 +1,71 @@
+"""Turn serial primary keys into identity columns
+
+Revision ID: 026_identity_keys
+Revises: 025_check_constraints
+Create Date: 2024-01-25 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '026_identity_keys'
+down_revision: Union[str, None] = '025_check_constraints'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, id type since 021_bigint_keys)
+ID_COLUMNS = [
+    ('project', 'integer'),
+    ('style_bible', 'integer'),
+    ('character', 'integer'),
+    ('location', 'integer'),
+    ('scene', 'integer'),
+    ('draft', 'bigint'),
+    ('event', 'integer'),
+    ('fact', 'bigint'),
+    ('story_constraint', 'integer'),
+    ('entity_link', 'bigint'),
+    ('iteration', 'bigint'),
+    ('check_run', 'bigint'),
+    ('task', 'bigint'),
+]
+
+
+def _restart_after_max(table: str) -> None:
+    """Point the id sequence, whichever kind owns it, past the existing rows."""
+    op.execute(
+        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+        f'COALESCE((SELECT MAX(id) FROM "{table}"), 0) + 1, false)'
+    )
+
+
+def upgrade() -> None:
+    """
+    Replace each serial's default and owned sequence with
+    GENERATED BY DEFAULT AS IDENTITY.
+
+    The identity is part of the column definition, so dumps, restores
+    and logical replicas carry it without a separate sequence and
+    default to keep in step. Explicit ids, as the fact COPY path uses,
+    are still accepted. Catalog-only: no table is rewritten.
+    """
+    for table, _ in ID_COLUMNS:
+        op.execute(f'ALTER TABLE "{table}" ALTER COLUMN id DROP DEFAULT')
+        op.execute(f'DROP SEQUENCE {table}_id_seq')
+        op.execute(f'ALTER TABLE "{table}" ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY')
+        _restart_after_max(table)
+
+
+def downgrade() -> None:
+    for table, id_type in reversed(ID_COLUMNS):
+        op.execute(f'ALTER TABLE "{table}" ALTER COLUMN id DROP IDENTITY')
+        op.execute(f'CREATE SEQUENCE {table}_id_seq AS {id_type} OWNED BY "{table}".id')
+        op.execute(
+            f'ALTER TABLE "{table}" ALTER COLUMN id '
+            f"SET DEFAULT nextval('{table}_id_seq'::regclass)"
+        )
+        _restart_after_max(table)
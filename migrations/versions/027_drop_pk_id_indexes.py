@@ -0,0 +1,52 @@
+"""Drop the id indexes that duplicate primary keys
+
+Revision ID: 027_drop_pk_id_indexes
+Revises: 026_identity_keys
+Create Date: 2024-01-26 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from migrations.timeouts import concurrent_block
+
+# revision identifiers, used by Alembic.
+revision: str = '027_drop_pk_id_indexes'
+down_revision: Union[str, None] = '026_identity_keys'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = [
+    'project', 'style_bible', 'character', 'location', 'scene', 'draft', 'event',
+    'fact', 'story_constraint', 'entity_link', 'iteration', 'check_run', 'task',
+]
+
+
+def upgrade() -> None:
+    """
+    Drop ix_<table>_id on every table.
+
+    Each primary key already carries a unique B-tree on id, so these
+    plain indexes were never chosen and only added a write per insert.
+    Dropped concurrently from an autocommit block.
+    """
+    with concurrent_block():
+        for table in TABLES:
+            op.drop_index(
+                f'ix_{table}_id', table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with concurrent_block():
+        for table in reversed(TABLES):
+            op.create_index(
+                f'ix_{table}_id', table, ['id'],
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
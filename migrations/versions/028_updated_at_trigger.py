@@ -0,0 +1,50 @@
+"""Keep updated_at current with a trigger
+
+Revision ID: 028_updated_at_trigger
+Revises: 027_drop_pk_id_indexes
+Create Date: 2024-01-27 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '028_updated_at_trigger'
+down_revision: Union[str, None] = '027_drop_pk_id_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+UPDATED_AT_TABLES = ['project', 'character', 'location', 'scene', 'iteration', 'task']
+
+
+def upgrade() -> None:
+    """
+    Stamp updated_at on every UPDATE from one shared trigger function.
+
+    created_at and updated_at already default to now() (013). The ORM's
+    onupdate covers statements the app issues; the trigger also covers
+    writes that bypass it, such as ad hoc SQL and maintenance scripts.
+    now() is the transaction timestamp, so both agree on the value.
+    """
+    op.execute("""
+        CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at := now();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in UPDATED_AT_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER {table}_updated_at
+            BEFORE UPDATE ON "{table}"
+            FOR EACH ROW EXECUTE FUNCTION set_updated_at()
+        """)
+
+
+def downgrade() -> None:
+    for table in reversed(UPDATED_AT_TABLES):
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_updated_at ON "{table}"')
+    op.execute("DROP FUNCTION IF EXISTS set_updated_at()")
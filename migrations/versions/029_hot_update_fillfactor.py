@@ -0,0 +1,39 @@
+"""Leave free space on iteration pages for HOT updates
+
+Revision ID: 029_hot_update_fillfactor
+Revises: 028_updated_at_trigger
+Create Date: 2024-01-28 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '029_hot_update_fillfactor'
+down_revision: Union[str, None] = '028_updated_at_trigger'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+HOT_UPDATE_TABLES = ['iteration']
+
+
+def upgrade() -> None:
+    """
+    Set fillfactor=90 on the tables the pipeline updates in place.
+
+    Iterations are rewritten on every status change, and no index covers
+    status or updated_at. With room left on the page such an update is
+    written as a heap-only tuple and skips the index inserts. task
+    follows in 030, once status is out of its index keys. This only
+    changes the storage parameter; pages already full take it up as they
+    are vacuumed and refilled.
+    """
+    for table in HOT_UPDATE_TABLES:
+        op.execute(f'ALTER TABLE {table} SET (fillfactor = 90)')
+
+
+def downgrade() -> None:
+    for table in reversed(HOT_UPDATE_TABLES):
+        op.execute(f'ALTER TABLE {table} RESET (fillfactor)')
@@ -0,0 +1,61 @@
+"""Index tasks by iteration without status, and leave room on task pages
+
+Revision ID: 030_task_iteration_index
+Revises: 029_hot_update_fillfactor
+Create Date: 2024-01-29 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from migrations.timeouts import concurrent_block
+
+# revision identifiers, used by Alembic.
+revision: str = '030_task_iteration_index'
+down_revision: Union[str, None] = '029_hot_update_fillfactor'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Replace ix_task_iteration_status (003) with ix_task_iteration, and set
+    fillfactor=90 on task.
+
+    Pending tasks are found through the partial ix_task_pending, so status
+    in the key served no query; loading an iteration's tasks (selectin)
+    and cascading its delete only need iteration_id first. With status out
+    of the key, only ix_task_pending's predicate still reads it, so status
+    changes keep inserting index entries (they can't be HOT), but the new
+    row versions land on the same page instead of extending the heap.
+    """
+    with concurrent_block():
+        op.create_index(
+            'ix_task_iteration', 'task', ['iteration_id', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_task_iteration_status', table_name='task',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.execute('ALTER TABLE task SET (fillfactor = 90)')
+
+
+def downgrade() -> None:
+    op.execute('ALTER TABLE task RESET (fillfactor)')
+    with concurrent_block():
+        op.create_index(
+            'ix_task_iteration_status', 'task', ['iteration_id', 'status', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_task_iteration', table_name='task',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,91 @@
+"""
+Shared fixtures.
+
+Database tests run against the Postgres named by TEST_DATABASE_URL, migrated
+to head once per session and emptied before every test. Without it they are
+skipped; the unit tests always run.
+"""
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event, text
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+if TEST_DATABASE_URL:
+    # app.db and migrations/env.py both read DATABASE_URL at import
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def pytest_collection_modifyitems(config, items):
+    if TEST_DATABASE_URL:
+        return
+    skip = pytest.mark.skip(reason="TEST_DATABASE_URL is not set")
+    for item in items:
+        if "migrated_database" in item.fixturenames:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def migrated_database():
+    """Bring the test database to the head revision."""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "migrations"))
+    command.upgrade(config, "head")
+
+
+@pytest.fixture
+async def db(migrated_database):
+    """A session on an empty database; the app's caches are cleared too."""
+    from app import main
+    from app.db import SessionLocal, engine
+
+    async with SessionLocal() as session:
+        # Every other table references project, directly or through scene
+        await session.execute(text("TRUNCATE project RESTART IDENTITY CASCADE"))
+        await session.commit()
+        yield session
+    for cache in (main.draft_cache, main.project_cache, main.scene_cache):
+        cache.clear()
+    # Pooled asyncpg connections can't outlive this test's event loop
+    await engine.dispose()
+
+
+@pytest.fixture
+async def client(db):
+    """HTTP client calling the app in process."""
+    from httpx import ASGITransport, AsyncClient
+    from app.main import app
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def count_queries():
+    """
+    Context manager collecting the execution context of every statement the
+    app's engine sends; each one is a round trip to Postgres.
+    """
+    from app.db import engine
+
+    @contextmanager
+    def counter():
+        executed = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            executed.append(context)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield executed
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    return counter
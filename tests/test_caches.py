@@ -0,0 +1,78 @@
+"""
+The point-lookup caches in app.main; no database needed.
+"""
+import time
+from datetime import datetime, timezone
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app import main, schemas
+from app.db import get_db
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class NoSession:
+    """Injected in place of a session; any use of it fails the request."""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"database used: session.{name}")
+
+
+@pytest.fixture
+async def cached_client():
+    """A client whose requests fail if they touch the database."""
+    async def no_db():
+        yield NoSession()
+
+    main.app.dependency_overrides[get_db] = no_db
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=main.app), base_url="http://test"
+        ) as client:
+            yield client
+    finally:
+        main.app.dependency_overrides.clear()
+        for cache in (main.draft_cache, main.project_cache, main.scene_cache):
+            cache.clear()
+
+
+@pytest.mark.parametrize("cache, path, read", [
+    (main.draft_cache, "/drafts/7", schemas.DraftRead(
+        id=7, scene_id=1, version=1, text="Draft", created_at=NOW
+    )),
+    (main.project_cache, "/projects/7", schemas.ProjectRead(
+        id=7, name="Test", created_at=NOW, updated_at=NOW
+    )),
+    (main.scene_cache, "/scenes/7", schemas.SceneRead(
+        id=7, project_id=1, chapter_no=1, scene_no=1, created_at=NOW, updated_at=NOW
+    )),
+])
+async def test_cached_read_skips_the_database(cached_client, cache, path, read):
+    cache[7] = read
+
+    response = await cached_client.get(path)
+
+    assert response.status_code == 200
+    assert response.json() == read.model_dump(mode="json")
+
+
+async def test_cached_draft_is_served_immutable(cached_client):
+    main.draft_cache[7] = schemas.DraftRead(
+        id=7, scene_id=1, version=1, text="Draft", created_at=NOW
+    )
+
+    response = await cached_client.get("/drafts/7")
+
+    assert response.headers["cache-control"] == main.IMMUTABLE_CACHE_CONTROL
+
+
+@pytest.mark.parametrize("cache", [main.draft_cache, main.project_cache, main.scene_cache])
+def test_entries_expire(cache):
+    cache[7] = object()
+    try:
+        cache.expire(time.monotonic() + cache.ttl)
+        assert 7 not in cache
+    finally:
+        cache.clear()
@@ -0,0 +1,74 @@
+"""
+Draft checks: text statistics without a database, continuity against one.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from app import crud, schemas
+from app.services import pipeline
+from app.services.checks import compute_text_stats
+
+
+@pytest.mark.parametrize("text, words, adverbs", [
+    ("She walked slowly and quietly home.", 6, 2),
+    ("Softly softLY sly fly", 4, 2),
+    ("Émly ran étrangely vite.", 4, 1),
+    ("mot\xa0à\xa0mot lentement", 4, 0),
+    ("really quickly", 2, 2),
+    ("", 0, 0),
+])
+def test_word_and_adverb_counts(text, words, adverbs):
+    stats = compute_text_stats(text)
+    assert stats.word_count == words
+    assert stats.adverb_count == adverbs
+
+
+def test_forbidden_words_match_case_insensitively():
+    stats = compute_text_stats("It was SUDDENLY over.", ("suddenly", "abruptly"))
+    assert ("forbidden", "suddenly") in stats.matched
+    assert ("forbidden", "abruptly") not in stats.matched
+
+
+# ============================================================================
+# Continuity (database)
+# ============================================================================
+
+def _fact(predicate, value):
+    return schemas.FactBase(
+        fact_type="character_trait",
+        subject_type="character",
+        subject_id=1,
+        predicate=predicate,
+        object_jsonb={"value": value},
+        confidence=0.9
+    )
+
+
+async def test_run_checks_reports_contradiction_with_earlier_scene(db):
+    project = await crud.create_project(db, schemas.ProjectCreate(name="Test"))
+    first, second = [
+        await crud.create_scene(db, project.id, schemas.SceneCreate(chapter_no=1, scene_no=n))
+        for n in (1, 2)
+    ]
+    first_draft = await crud.create_draft(db, first.id, schemas.DraftCreate(text="One"))
+    second_draft = await crud.create_draft(db, second.id, schemas.DraftCreate(text="Two"))
+    await crud.create_facts(db, first_draft.id, [_fact("eye_color", "blue")])
+    await crud.create_facts(db, second_draft.id, [_fact("eye_color", "green")])
+    await crud.refresh_latest_facts(db)
+    iteration = await crud.create_iteration(db, second.id)
+    task = SimpleNamespace(
+        iteration_id=iteration.id,
+        input_jsonb={"scene_id": second.id, "draft_id": second_draft.id, "facts": []}
+    )
+
+    output = await pipeline.handle_run_checks(db, task)
+
+    assert not output["all_passed"]
+    assert [f for f in output["findings"] if "contradiction" in f["issue"]] == [{
+        "severity": "error",
+        "issue": "Potential contradiction: eye_color differs from previous fact",
+        "current": {"value": "green"},
+        "previous": {"value": "blue"},
+        "suggestion": "Reconcile the contradiction or justify the change"
+    }]
@@ -0,0 +1,127 @@
+"""
+Keyset pagination: the streamed Page framing, and walking the list
+endpoints page by page.
+"""
+from datetime import datetime, timezone
+
+import orjson
+from pydantic import TypeAdapter
+
+from app import crud, schemas
+from app.main import _stream_page
+
+
+# ============================================================================
+# Page framing
+# ============================================================================
+
+class _Rows:
+    """Stands in for the AsyncMappingResult left after the first row."""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._rows)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+async def _page(rows, limit):
+    first, rest = (rows[0], rows[1:]) if rows else (None, [])
+    response = _stream_page(first, _Rows(rest), limit)
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    return orjson.loads(body)
+
+
+async def test_empty_page():
+    assert await _page([], 10) == {"items": [], "next_cursor": None}
+
+
+async def test_short_page_has_no_cursor():
+    page = await _page([{"id": 1}, {"id": 2}], 3)
+    assert page == {"items": [{"id": 1}, {"id": 2}], "next_cursor": None}
+
+
+async def test_full_page_points_at_its_last_row():
+    page = await _page([{"id": 4}, {"id": 9}], 2)
+    assert page == {"items": [{"id": 4}, {"id": 9}], "next_cursor": 9}
+
+
+async def test_timestamps_match_pydantic():
+    created_at = datetime(2024, 1, 2, 3, 4, 5, 678000, tzinfo=timezone.utc)
+    page = await _page([{"id": 1, "created_at": created_at}], 10)
+    expected = TypeAdapter(datetime).dump_python(created_at, mode="json")
+    assert page["items"][0]["created_at"] == expected == "2024-01-02T03:04:05.678000Z"
+
+
+# ============================================================================
+# Walking pages (database)
+# ============================================================================
+
+async def _walk(client, path, limit):
+    """Every page of a list endpoint, following next_cursor to the end."""
+    pages, after_id = [], None
+    while True:
+        params = {"limit": limit}
+        if after_id is not None:
+            params["after_id"] = after_id
+        response = await client.get(path, params=params)
+        assert response.status_code == 200
+        pages.append(response.json())
+        after_id = pages[-1]["next_cursor"]
+        if after_id is None:
+            return pages
+
+
+async def test_projects_walk_two_pages(db, client):
+    ids = [
+        (await crud.create_project(db, schemas.ProjectCreate(name=f"P{n}"))).id
+        for n in range(3)
+    ]
+
+    pages = await _walk(client, "/projects", 2)
+
+    assert [[item["id"] for item in page["items"]] for page in pages] == [ids[:2], ids[2:]]
+    assert pages[0]["next_cursor"] == ids[1]
+    assert pages[1]["next_cursor"] is None
+
+
+async def test_exact_multiple_ends_with_an_empty_page(db, client):
+    ids = [
+        (await crud.create_project(db, schemas.ProjectCreate(name=f"P{n}"))).id
+        for n in range(4)
+    ]
+
+    pages = await _walk(client, "/projects", 2)
+
+    assert [[item["id"] for item in page["items"]] for page in pages] == [ids[:2], ids[2:], []]
+
+
+async def test_scenes_page_in_chapter_and_scene_order(db, client):
+    project = await crud.create_project(db, schemas.ProjectCreate(name="Test"))
+    # Inserted out of reading order, so IDs disagree with (chapter_no, scene_no)
+    for chapter_no, scene_no in [(2, 1), (1, 3), (1, 1), (3, 1), (1, 2)]:
+        await crud.create_scene(
+            db, project.id, schemas.SceneCreate(chapter_no=chapter_no, scene_no=scene_no)
+        )
+
+    pages = await _walk(client, f"/projects/{project.id}/scenes", 2)
+
+    assert [
+        [(item["chapter_no"], item["scene_no"]) for item in page["items"]]
+        for page in pages
+    ] == [[(1, 1), (1, 2)], [(1, 3), (2, 1)], [(3, 1)]]
+
+
+async def test_list_items_match_the_read_endpoint(db, client):
+    project = await crud.create_project(db, schemas.ProjectCreate(name="Test"))
+
+    listed = (await client.get("/projects")).json()["items"]
+    read = (await client.get(f"/projects/{project.id}")).json()
+
+    assert listed == [read]
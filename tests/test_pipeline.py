@@ -0,0 +1,115 @@
+"""
+The pipeline's state machine and inlining decisions, which need no
+database, and task execution against one.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from app import crud, schemas
+from app.services import pipeline
+from app.services.pipeline import IterationStatus, TaskType, TRANSITIONS
+
+
+# ============================================================================
+# State machine
+# ============================================================================
+
+@pytest.mark.parametrize("task_type, expected", [
+    (TaskType.PLAN_SCENE, TaskType.DRAFT_SCENE),
+    (TaskType.DRAFT_SCENE, TaskType.EXTRACT_FACTS),
+    (TaskType.EXTRACT_FACTS, TaskType.RUN_CHECKS),
+    (TaskType.REVISE, TaskType.EXTRACT_FACTS),
+    (TaskType.COMMIT, IterationStatus.PASSED),
+])
+def test_fixed_transitions(task_type, expected):
+    assert TRANSITIONS[task_type] == expected
+
+
+@pytest.mark.parametrize("current_attempt, all_passed, expected", [
+    (0, True, TaskType.COMMIT),
+    (3, True, TaskType.COMMIT),
+    (0, False, TaskType.REVISE),
+    (2, False, TaskType.REVISE),
+    (3, False, IterationStatus.FAILED),
+])
+def test_run_checks_transition(current_attempt, all_passed, expected):
+    after_run_checks = TRANSITIONS[TaskType.RUN_CHECKS]
+    input_data = {"current_attempt": current_attempt, "max_attempts": 3}
+    assert after_run_checks(input_data, {"all_passed": all_passed}) == expected
+
+
+def test_every_task_type_has_a_transition():
+    assert set(TRANSITIONS) == set(TaskType)
+
+
+# ============================================================================
+# Inlining
+# ============================================================================
+
+@pytest.fixture
+def queue_length(monkeypatch):
+    """Set how many jobs the (stand-in) RQ queue reports as waiting."""
+    queue = SimpleNamespace(count=0)
+    monkeypatch.setattr(pipeline, "get_task_queue", lambda: queue)
+
+    def set_length(count):
+        queue.count = count
+
+    return set_length
+
+
+def _task(task_type):
+    # Tasks loaded from the database carry the type as a plain string
+    return SimpleNamespace(task_type=task_type.value)
+
+
+def test_inlines_cheap_task_while_queue_is_empty(queue_length):
+    queue_length(0)
+    assert pipeline._should_inline(_task(TaskType.DRAFT_SCENE), 0)
+
+
+def test_does_not_inline_run_checks(queue_length):
+    queue_length(0)
+    assert not pipeline._should_inline(_task(TaskType.RUN_CHECKS), 0)
+
+
+def test_does_not_inline_while_jobs_are_waiting(queue_length):
+    queue_length(1)
+    assert not pipeline._should_inline(_task(TaskType.DRAFT_SCENE), 0)
+
+
+def test_stops_inlining_at_the_limit(queue_length):
+    queue_length(0)
+    task = _task(TaskType.EXTRACT_FACTS)
+    assert pipeline._should_inline(task, pipeline.MAX_INLINE_TASKS - 1)
+    assert not pipeline._should_inline(task, pipeline.MAX_INLINE_TASKS)
+
+
+# ============================================================================
+# Task execution (database)
+# ============================================================================
+
+async def test_failed_transition_rolls_back_handler_writes(db, monkeypatch):
+    project = await crud.create_project(db, schemas.ProjectCreate(name="Test"))
+    scene = await crud.create_scene(
+        db, project.id, schemas.SceneCreate(chapter_no=1, scene_no=1)
+    )
+    iteration = await crud.create_iteration(db, scene.id)
+    task = await crud.create_task(
+        db, iteration.id, TaskType.DRAFT_SCENE.value, {"scene_id": scene.id}
+    )
+    # The rollback expires every loaded object
+    scene_id, task_id = scene.id, task.id
+
+    async def fail(*args):
+        raise RuntimeError("transition failed")
+
+    monkeypatch.setattr(pipeline, "advance_state_machine", fail)
+    with pytest.raises(RuntimeError):
+        await pipeline._run_task(db, task_id)
+
+    # The draft was written in the same transaction as the task's completion
+    assert await crud.get_latest_draft(db, scene_id) is None
+    failed = await crud.get_task(db, task_id)
+    assert failed.status == "failed"
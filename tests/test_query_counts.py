@@ -0,0 +1,169 @@
+"""
+Query budgets for the hot read and write paths.
+
+Each test counts the statements the app's engine sends while it runs one
+operation, so an N+1 load or an unbatched insert fails here.
+"""
+import pytest
+from sqlalchemy.engine.interfaces import CacheStats
+
+from app import crud, schemas
+from app.services import pipeline
+
+
+async def _project_with_scenes(db, count=2):
+    project = await crud.create_project(db, schemas.ProjectCreate(name="Test"))
+    scenes = [
+        await crud.create_scene(
+            db, project.id, schemas.SceneCreate(chapter_no=1, scene_no=scene_no)
+        )
+        for scene_no in range(1, count + 1)
+    ]
+    return project, scenes
+
+
+def _fact(predicate, value, confidence=0.9):
+    return schemas.FactBase(
+        fact_type="character_trait",
+        subject_type="character",
+        subject_id=1,
+        predicate=predicate,
+        object_jsonb={"value": value},
+        confidence=confidence
+    )
+
+
+async def _draft_with_contradiction(db):
+    """A second-scene draft whose eye_color contradicts the first scene's."""
+    _, (first, second) = await _project_with_scenes(db)
+    first_draft = await crud.create_draft(db, first.id, schemas.DraftCreate(text="One"))
+    second_draft = await crud.create_draft(db, second.id, schemas.DraftCreate(text="Two"))
+    await crud.create_facts(db, first_draft.id, [_fact("eye_color", "blue"), _fact("height", "tall")])
+    await crud.create_facts(db, second_draft.id, [_fact("eye_color", "green"), _fact("height", "tall")])
+    await crud.refresh_latest_facts(db)
+    return second, second_draft
+
+
+# ============================================================================
+# Continuity
+# ============================================================================
+
+async def test_contradicting_facts_is_one_query(db, count_queries):
+    scene, draft = await _draft_with_contradiction(db)
+
+    with count_queries() as executed:
+        rows = await crud.get_contradicting_facts(db, draft.id, scene.id)
+
+    assert len(executed) == 1
+    assert [dict(row) for row in rows] == [{
+        "predicate": "eye_color",
+        "current_object": {"value": "green"},
+        "previous_object": {"value": "blue"},
+    }]
+
+
+async def test_contradicting_facts_reuses_compiled_statement(db, count_queries):
+    scene, draft = await _draft_with_contradiction(db)
+    await crud.get_contradicting_facts(db, draft.id, scene.id)
+
+    with count_queries() as executed:
+        await crud.get_contradicting_facts(db, draft.id, scene.id)
+
+    assert [context.cache_hit for context in executed] == [CacheStats.CACHE_HIT]
+
+
+# ============================================================================
+# Reads
+# ============================================================================
+
+async def test_get_iteration_loads_children_in_three_queries(db, client, count_queries):
+    _, (scene, _) = await _project_with_scenes(db)
+    draft = await crud.create_draft(db, scene.id, schemas.DraftCreate(text="Draft"))
+    iteration = await crud.create_iteration(db, scene.id)
+    await crud.create_tasks(db, [
+        {"iteration_id": iteration.id, "task_type": task_type, "input_jsonb": {}}
+        for task_type in ("PLAN_SCENE", "DRAFT_SCENE", "EXTRACT_FACTS")
+    ])
+    await crud.create_check_runs(db, iteration.id, draft.id, [
+        {"check_type": check_type, "passed": True, "findings_jsonb": []}
+        for check_type in ("continuity", "style")
+    ])
+
+    with count_queries() as executed:
+        response = await client.get(f"/pipeline/iterations/{iteration.id}")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["tasks"]) == 3
+    assert len(body["check_runs"]) == 2
+    assert len(executed) <= 3
+
+
+@pytest.mark.parametrize("path", [
+    "/projects",
+    "/projects/{project_id}/characters",
+    "/projects/{project_id}/scenes",
+    "/scenes/{scene_id}/drafts",
+])
+async def test_list_endpoints_stay_within_query_budget(db, client, count_queries, path):
+    project, scenes = await _project_with_scenes(db, count=5)
+    for name in ("Ada", "Ben", "Cy"):
+        await crud.create_character(db, project.id, schemas.CharacterCreate(name=name))
+    for text in ("First", "Second", "Third"):
+        await crud.create_draft(db, scenes[0].id, schemas.DraftCreate(text=text))
+
+    with count_queries() as executed:
+        response = await client.get(path.format(project_id=project.id, scene_id=scenes[0].id))
+
+    assert response.status_code == 200
+    assert response.json()["items"]
+    assert len(executed) <= 3
+
+
+# ============================================================================
+# Bulk writes
+# ============================================================================
+
+async def test_create_tasks_is_one_insert(db, count_queries):
+    _, (scene, _) = await _project_with_scenes(db)
+    iteration = await crud.create_iteration(db, scene.id)
+    tasks = [
+        {"iteration_id": iteration.id, "task_type": "EXTRACT_FACTS", "input_jsonb": {"n": n}}
+        for n in range(500)
+    ]
+
+    with count_queries() as executed:
+        task_ids = await crud.create_tasks(db, tasks)
+
+    assert len(task_ids) == 500
+    assert len(executed) == 1
+
+
+async def test_create_facts_below_copy_threshold_is_one_insert(db, count_queries):
+    _, (scene, _) = await _project_with_scenes(db)
+    draft = await crud.create_draft(db, scene.id, schemas.DraftCreate(text="Draft"))
+    facts = [_fact(f"trait_{n}", n) for n in range(crud.FACT_COPY_THRESHOLD - 1)]
+
+    with count_queries() as executed:
+        fact_ids = await crud.create_facts(db, draft.id, facts)
+
+    assert len(fact_ids) == len(facts)
+    assert len(executed) == 1
+
+
+async def test_start_iterations_is_one_insert_per_table(db, count_queries, monkeypatch):
+    _, scenes = await _project_with_scenes(db, count=3)
+    await crud.create_iteration(db, scenes[1].id)
+    enqueued = []
+    monkeypatch.setattr(pipeline, "enqueue_tasks", enqueued.extend)
+    scene_ids = [scenes[0].id, scenes[1].id, scenes[2].id, scenes[0].id]
+
+    with count_queries() as executed:
+        iterations = await pipeline.start_iterations(db, scene_ids)
+
+    assert [(i.scene_id, i.iteration_no) for i in iterations] == [
+        (scenes[0].id, 1), (scenes[1].id, 2), (scenes[2].id, 1), (scenes[0].id, 2)
+    ]
+    assert len(enqueued) == 4
+    inserts = [c.statement for c in executed if c.statement.startswith("INSERT")]
+    assert [statement.split()[2] for statement in inserts] == ["iteration", "task"]